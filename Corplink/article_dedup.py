@@ -0,0 +1,78 @@
+# coding: utf-8
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16          # 16 段 × 4 行：Jaccard ≈ 0.5 以上的文章基本都会成为候选
+SHINGLE_SIZE = 5    # 以 5 个词为一个 shingle
+
+_PRIME = np.uint64(4294967311)  # 大于 2^32 的素数
+_rng = np.random.RandomState(20240105)  # 固定种子：子进程与主进程得到同一组哈希函数
+_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+_TOKEN = re.compile(r"\w+")
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    k = min(SHINGLE_SIZE, len(tokens))
+    shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles),
+                       dtype=np.uint64, count=len(shingles))
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """正文的 MinHash 签名（NUM_PERM 个 uint32）；正文为空时返回 None。"""
+    h = _shingle_hashes(text)
+    if len(h) == 0:
+        return None
+    # (a·h + b) mod p：a < 2^31、h < 2^32，乘积不会溢出 uint64
+    perm = (np.outer(_A, h) + _B[:, None]) % _PRIME
+    return perm.min(axis=1).astype(np.uint32)
+
+class LshIndex:
+    """
+    MinHash 签名的 LSH 索引。按到达顺序处理：第一次出现的文章成为代表，
+    之后与某个代表的估计 Jaccard ≥ threshold 的文章判为它的近重复。
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+        self._sigs: List[np.ndarray] = []
+        self._payloads: List[Any] = []
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(BANDS)]
+
+    def find_or_add(self, sig: np.ndarray, payload: Any) -> Optional[Tuple[Any, float]]:
+        """
+        已有近重复时返回 (代表文章的 payload, 估计相似度)，不加入索引；
+        否则把这篇文章登记为新的代表并返回 None。
+        """
+        keys = self._band_keys(sig)
+        seen = set()
+        best, best_sim = -1, 0.0
+        for bucket, key in zip(self._buckets, keys):
+            for cand in bucket.get(key, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                sim = float(np.mean(self._sigs[cand] == sig))
+                # 相似度相同取先登记的代表
+                if sim > best_sim or (sim == best_sim and best != -1 and cand < best):
+                    best, best_sim = cand, sim
+        if best != -1 and best_sim >= self.threshold:
+            return self._payloads[best], best_sim
+
+        idx = len(self._sigs)
+        self._sigs.append(sig)
+        self._payloads.append(payload)
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(idx)
+        return None
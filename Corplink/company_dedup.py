@@ -0,0 +1,66 @@
+# coding: utf-8
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+_SEP = "\x00"  # 键里只有 [a-z0-9]，用它拼接不会产生跨键的子串
+
+def containment_key(name: str) -> str:
+    return _NON_ALNUM.sub("", str(name)).lower()
+
+class ContainmentDeduper:
+    """
+    同一行公司名的包含关系去重（Step-2 / Step-3 共用）：
+    按名称长度从长到短处理，键（只留字母数字、小写）与已保留的某个键互相包含时丢弃。
+      - “新键 ⊂ 已保留键”：已保留键用分隔符拼成一个串，一次 `in` 完成；
+      - “已保留键 ⊂ 新键”：已保留键按长度分组放进集合，只查新键里这些长度的子串。
+    键与整行结果都会缓存，result.csv 中大量重复的名称/行只算一次。
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, str] = {}
+        self._rows: Dict[Tuple[str, ...], List[str]] = {}
+
+    def _key(self, name: str) -> str:
+        k = self._keys.get(name)
+        if k is None:
+            k = self._keys[name] = containment_key(name)
+        return k
+
+    def dedup(self, names: Sequence[str]) -> List[str]:
+        row = tuple(names)
+        cached = self._rows.get(row)
+        if cached is not None:
+            return list(cached)
+
+        kept: List[str] = []
+        kept_keys: List[str] = []
+        kept_set = set()
+        kept_lens = set()
+        joined = ""
+        for nm in sorted(row, key=len, reverse=True):
+            k = self._key(nm)
+            if kept_keys:
+                if k in joined:
+                    continue
+                if any(k[i:i + n] in kept_set
+                       for n in kept_lens if n <= len(k)
+                       for i in range(len(k) - n + 1)):
+                    continue
+            kept.append(nm)
+            kept_keys.append(k)
+            kept_set.add(k)
+            kept_lens.add(len(k))
+            joined = _SEP.join(kept_keys)
+        self._rows[row] = kept
+        return list(kept)
+
+    def dedup_rows(self, rows: Iterable[Sequence[str]]) -> List[List[str]]:
+        return [self.dedup(r) for r in rows]
+
+def write_row_names(df: pd.DataFrame, cols: Sequence[str], rows: List[List[str]]) -> None:
+    """把每行的名称依次写回 cols（不足的补空串），按列整体赋值。"""
+    for i, col in enumerate(cols):
+        df[col] = [r[i] if i < len(r) else "" for r in rows]
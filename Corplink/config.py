@@ -53,6 +53,21 @@ def wizard() -> RunOptions:
             custom_keywords=custom_keys,
             ai_level=ai_level,
             extract_mode=extract_mode,
+            extract_workers=int(WEB_CONFIG.get("extract_workers", 1)),
+            record_chunk_size=int(WEB_CONFIG.get("record_chunk_size", 5000)),
+            ner_batch_size=int(WEB_CONFIG.get("ner_batch_size", 256)),
+            ner_processes=int(WEB_CONFIG.get("ner_processes", 1)),
+            ner_prefilter=str(WEB_CONFIG.get("ner_prefilter", "n")) == "y",
+            use_ner_cache=str(WEB_CONFIG.get("use_ner_cache", "y")) == "y",
+            use_extract_cache=str(WEB_CONFIG.get("use_extract_cache", "y")) == "y",
+            input_archive=WEB_CONFIG.get("input_zip", ""),
+            semantic_batch_size=int(WEB_CONFIG.get("semantic_batch_size", 1024)),
+            dedup_articles=str(WEB_CONFIG.get("dedup_articles", "n")) == "y",
+            dedup_threshold=float(WEB_CONFIG.get("dedup_threshold", 0.8)),
+            use_embed_cache=str(WEB_CONFIG.get("use_embed_cache", "y")) == "y",
+            embed_cache_max_mb=int(WEB_CONFIG.get("embed_cache_max_mb", 512)),
+            nn_backend=str(WEB_CONFIG.get("nn_backend", "exact")),
+            nn_nprobe=int(WEB_CONFIG.get("nn_nprobe", 8)),
         )
 
     # ====== 终端模式：保持原有的手动输入逻辑 ======
@@ -124,6 +139,21 @@ def apply_options_to_state(opts: RunOptions) -> None:
 
     # Extract mode (必修 4 需要它)
     state.EXTRACT_MODE = opts.extract_mode.value
+    state.EXTRACT_WORKERS = opts.extract_workers
+    state.RECORD_CHUNK_SIZE = max(1, opts.record_chunk_size)
+    state.NER_BATCH_SIZE = max(1, opts.ner_batch_size)
+    state.NER_PROCESSES = opts.ner_processes if opts.ner_processes != 0 else 1
+    state.NER_PREFILTER = opts.ner_prefilter
+    state.USE_NER_CACHE = opts.use_ner_cache
+    state.USE_EXTRACT_CACHE = opts.use_extract_cache
+    state.INPUT_ARCHIVE = opts.input_archive
+    state.SEMANTIC_BATCH_SIZE = max(1, opts.semantic_batch_size)
+    state.DEDUP_ARTICLES = opts.dedup_articles
+    state.DEDUP_THRESHOLD = opts.dedup_threshold
+    state.USE_EMBED_CACHE = opts.use_embed_cache
+    state.EMBED_CACHE_MAX_MB = max(1, opts.embed_cache_max_mb)
+    state.NN_BACKEND = opts.nn_backend if opts.nn_backend in ("exact", "ivf") else "exact"
+    state.NN_NPROBE = max(1, opts.nn_nprobe)
 
 # ====== 旧接口保留（兼容），但建议主流程不用 ======
 def configure_keywords():
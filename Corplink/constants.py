@@ -1,8 +1,12 @@
 # coding: utf-8
+import os
 import re
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# 各磁盘缓存（抽取 / 句向量 / canonical 索引 / NER）的根目录；
+# 可用环境变量 CORPLINK_CACHE_DIR 指到工作目录之外（WebApp 每次上传都会清空工作目录）
+CACHE_DIR = Path(os.environ.get("CORPLINK_CACHE_DIR") or BASE_DIR / ".corplink_cache")
 MAX_COMP_COLS = 50
 
 STOPWORDS = {"the","and","for","with","from","that","this","have","will","are","you","not","but","all","any","one","our","their"}
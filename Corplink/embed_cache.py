@@ -0,0 +1,155 @@
+# coding: utf-8
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .constants import CACHE_DIR
+from .file_lock import FileLock
+
+CACHE_ROOT = CACHE_DIR / "embeddings"
+
+_MIN_SLOTS = 1024
+
+def text_key(text: str, normalize: bool) -> str:
+    return hashlib.sha1(f"{int(normalize)}\x00{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    句向量的磁盘缓存（每个模型一个目录）：
+      vectors.f16 —— float16 的 memmap，每个槽位一条向量；
+      index.sqlite —— 文本哈希 → 槽位 + 最近使用时间。
+    超过 max_bytes 时按最近最少使用淘汰，腾出的槽位循环复用；vectors.f16 不会超过 max_bytes
+    （至少 _MIN_SLOTS 个槽位）。单次调用的新文本多到放不下时，放不下的部分照常返回、不写入缓存。
+    命中与未命中都返回 float16 精度的向量，同一文本每次运行得到的结果一致。
+    """
+
+    def __init__(self, model_name: str, dim: int, max_bytes: int, root: Path = CACHE_ROOT):
+        self.dim = dim
+        self.max_items = max(_MIN_SLOTS, max_bytes // (dim * 2))
+        self.dir = Path(root) / re.sub(r"[^\w.-]+", "_", model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # 槽位分配表常驻内存，两个进程同时写会互相覆盖：整个生命周期持有目录锁，
+        # 拿不到锁（另一个运行正在使用）时抛错，调用方本次不用缓存
+        self._lock = FileLock(self.dir / "lock")
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError(f"{self.dir} 正被另一个进程使用")
+        self._vec_path = self.dir / "vectors.f16"
+        self._db = sqlite3.connect(str(self.dir / "index.sqlite"))
+        # 每次 encode 都会提交一次；WAL + NORMAL 下提交不触发 fsync
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER, last_used INTEGER)"
+        )
+        row = self._db.execute("SELECT v FROM meta WHERE k = 'dim'").fetchone()
+        if row is None or int(row[0]) != dim:
+            # 维度变了（换了模型/后端）就整体作废
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(dim),))
+            self._vec_path.unlink(missing_ok=True)
+        self._db.commit()
+
+        n_slots = self._vec_path.stat().st_size // (dim * 2) if self._vec_path.exists() else 0
+        self._vecs = None
+        # 上限调小时截断文件，落在截掉部分的条目一并删除（否则文件再长大时会指向别的向量）
+        self._open_vectors(min(max(n_slots, _MIN_SLOTS), self.max_items))
+        self._db.execute("DELETE FROM entries WHERE slot >= ?", (len(self._vecs),))
+        self._db.commit()
+
+        self._index: Dict[str, List[int]] = {}
+        for key, slot, last_used in self._db.execute("SELECT key, slot, last_used FROM entries"):
+            self._index[key] = [slot, last_used]
+        used = {slot for slot, _ in self._index.values()}
+        self._free = [s for s in range(len(self._vecs) - 1, -1, -1) if s not in used]
+        self._tick = max((t for _, t in self._index.values()), default=0)
+        self.hits = 0
+        self.misses = 0
+
+    def _open_vectors(self, n_slots: int) -> None:
+        if self._vecs is not None:
+            self._vecs.flush()
+            self._vecs = None
+        with open(self._vec_path, "ab") as f:
+            f.truncate(n_slots * self.dim * 2)
+        self._vecs = np.memmap(self._vec_path, dtype=np.float16, mode="r+", shape=(n_slots, self.dim))
+
+    def _reserve(self, n: int) -> List[int]:
+        """
+        分配最多 n 个槽位。本次调用用到的条目不淘汰，所以淘汰之后仍放不下时返回的槽位少于 n，
+        条目数与文件大小都不超过 max_items。
+        """
+        if len(self._index) + n > self.max_items:
+            self._evict(len(self._index) + n - self.max_items)
+        n = min(n, self.max_items - len(self._index))
+        if len(self._free) < n:
+            old = len(self._vecs)
+            new = min(max(old * 2, old + n - len(self._free)), self.max_items)
+            self._open_vectors(new)
+            self._free = list(range(new - 1, old - 1, -1)) + self._free
+        return [self._free.pop() for _ in range(n)]
+
+    def _evict(self, n: int) -> None:
+        # 多淘汰 10%，避免接近上限时每次调用都触发淘汰；本次调用正在用的条目不淘汰
+        n = n + self.max_items // 10
+        victims = sorted((kv for kv in self._index.items() if kv[1][1] < self._tick),
+                         key=lambda kv: kv[1][1])[:n]
+        for key, (slot, _) in victims:
+            del self._index[key]
+            self._free.append(slot)
+        self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+        self._db.commit()
+
+    def encode(self, texts: Sequence[str], encoder: Callable[[List[str]], np.ndarray],
+               normalize: bool = True) -> np.ndarray:
+        """
+        返回 texts 的向量（float32，形状 (len(texts), dim)）。
+        只对缓存里没有的文本（去重后）调用 encoder，新向量写回缓存。
+        """
+        self._tick += 1
+        keys = [text_key(t, normalize) for t in texts]
+        missing: Dict[str, str] = {}
+        touched = []
+        for k, t in zip(keys, texts):
+            entry = self._index.get(k)
+            if entry is None:
+                missing.setdefault(k, t)
+            elif entry[1] != self._tick:
+                entry[1] = self._tick
+                touched.append((self._tick, k))
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        new_rows = []
+        overflow: Dict[str, np.ndarray] = {}  # 超出上限、不写入缓存的新向量
+        if missing:
+            vecs = np.asarray(encoder(list(missing.values())), dtype=np.float32).astype(np.float16)
+            slots = self._reserve(len(missing))
+            self._vecs[slots] = vecs[:len(slots)]
+            for k, slot in zip(missing, slots):
+                self._index[k] = [slot, self._tick]
+                new_rows.append((k, slot, self._tick))
+            overflow = dict(zip(list(missing)[len(slots):], vecs[len(slots):]))
+
+        # 先写向量、再提交索引：进程中途退出最多留下孤立的槽位
+        self._db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", new_rows)
+        self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", touched)
+        self._db.commit()
+
+        if not overflow:
+            slots = np.fromiter((self._index[k][0] for k in keys), dtype=np.int64, count=len(keys))
+            return np.asarray(self._vecs[slots], dtype=np.float32).reshape(len(keys), self.dim)
+        out = np.empty((len(keys), self.dim), dtype=np.float32)
+        for i, k in enumerate(keys):
+            vec = overflow.get(k)
+            out[i] = vec if vec is not None else self._vecs[self._index[k][0]]
+        return out
+
+    def close(self) -> None:
+        self._vecs.flush()
+        self._db.close()
+        self._lock.release()
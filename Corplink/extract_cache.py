@@ -0,0 +1,52 @@
+# coding: utf-8
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+from . import constants
+
+CACHE_DIR = constants.CACHE_DIR / "extract"
+
+def file_digest(source: Union[str, BinaryIO], chunk_size: int = 1 << 20) -> str:
+    """文件内容的 SHA-1；source 为二进制流时读完后回到开头，供后续解析复用。"""
+    h = hashlib.sha1()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                h.update(block)
+    else:
+        for block in iter(lambda: source.read(chunk_size), b""):
+            h.update(block)
+        source.seek(0)
+    return h.hexdigest()
+
+def cache_load(key: str) -> Optional[Any]:
+    fp = CACHE_DIR / f"{key}.json.gz"
+    if not fp.exists():
+        return None
+    try:
+        with gzip.open(fp, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        # 损坏的缓存直接当作未命中，重新解析后覆盖
+        return None
+
+def cache_store(key: str, data: Any) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"⚠️ 抽取缓存写入失败（不影响结果）: {e}")
+        return
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        # 原子替换：多个 Step-1 进程同时写同一文件也不会读到半截内容
+        os.replace(tmp, CACHE_DIR / f"{key}.json.gz")
+    except Exception as e:
+        Path(tmp).unlink(missing_ok=True)
+        print(f"⚠️ 抽取缓存写入失败（不影响结果）: {e}")
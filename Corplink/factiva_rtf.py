@@ -1,13 +1,21 @@
 # coding: utf-8
 from __future__ import annotations
 
+import codecs
+import io
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 
 from striprtf.striprtf import rtf_to_text
 
+from .rtf_tables import (
+    RTF_TOKEN, HYPERLINKS, FONTTABLE,
+    DESTINATIONS as RTF_DESTINATIONS, SPECIALCHARS as RTF_SPECIALCHARS,
+    SECTIONCHARS as RTF_SECTIONCHARS, CHARSET_MAP as RTF_CHARSET_MAP,
+)
+
 HEAD_DATETIME = re.compile(r"\b(20\d{2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2}:\d{2})\b")
 DATE_JP = re.compile(r"(20\d{2})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日\s*(\d{1,2}:\d{2})")
 DATE_SLASH = re.compile(r"(20\d{2})[/-](\d{1,2})[/-](\d{1,2})\s+(\d{1,2}:\d{2})")
@@ -30,8 +38,11 @@ class FactivaRecord:
     body: str
 
 
-def read_rtf_text(path: Path) -> str:
-    raw = path.read_text(errors="ignore")
+def read_rtf_text(path: Union[Path, BinaryIO]) -> str:
+    if isinstance(path, Path):
+        raw = path.read_text(errors="ignore")
+    else:
+        raw = path.read().decode("utf-8", errors="ignore")
     txt = rtf_to_text(raw)
     txt = txt.replace("\r\n", "\n").replace("\r", "\n")
     txt = re.sub(r"\n{3,}", "\n\n", txt)
@@ -196,3 +207,244 @@ def parse_records_from_text(text: str) -> List[FactivaRecord]:
             records.append(rec)
 
     return records
+
+# 连续的普通字符按一段处理（逐字符走 RTF_TOKEN 与 striprtf 等价，但慢得多）
+_RTF_PLAIN_RUN = re.compile(r"[^\\{}\r\n]+")
+
+
+class RtfStreamDecoder:
+    """
+    增量版 striprtf.rtf_to_text：分块 feed() RTF 源文本，逐块返回纯文本。
+    状态（分组栈、字体表、unicode 跳过计数、未完成的 \\'hh 序列）跨块保留，
+    内存只与块大小相关。\\bin 二进制数据直接跳过（相当于 striprtf 的 pict 预处理）。
+    """
+
+    _TAIL = 64  # 块尾保留的字符数：最长控制字不超过 45 个字符
+
+    def __init__(self, encoding: str = "cp1252", errors: str = "ignore"):
+        self.encoding = encoding
+        self.default_encoding = encoding  # 字体表按初始编码兜底，不受 \ansicpg 影响
+        self.errors = errors
+        self.stack: List[Tuple[int, bool, bool]] = []
+        self.fonttbl = {}
+        self.default_font = None
+        self.current_font = None
+        self.ignorable = False
+        self.suppress_output = False
+        self.ucskip = 1
+        self.curskip = 0
+        self.hexes = None
+        self.depth = 0
+        self.in_document = False
+        self.done = False
+        self._buf = ""
+        self._bin_skip = 0
+        self._font_raw: Optional[List[str]] = None
+        self._font_depth = 0
+
+    def _close_fonttbl(self) -> None:
+        for font_id, fcharset, font_name in FONTTABLE.findall("".join(self._font_raw)):
+            self.fonttbl[font_id] = {
+                "name": font_name.strip(),
+                "charset": fcharset,
+                "encoding": RTF_CHARSET_MAP.get(int(fcharset), self.default_encoding),
+            }
+        self._font_raw = None
+
+    def _plain_run(self, run: str, out: List[str]) -> None:
+        if self._font_raw is not None:
+            self._font_raw.append(run)
+        skip = min(self.curskip, len(run))
+        self.curskip -= skip
+        if not self.ignorable and not self.suppress_output and skip < len(run):
+            out.append(run[skip:] if skip else run)
+
+    def _token(self, m, out: List[str]) -> None:
+        word, arg, _hex, char, brace, tchar = m.groups()
+        if self._font_raw is not None:
+            self._font_raw.append(m.group(0))
+        if self.hexes and not _hex:
+            enc = self.fonttbl.get(self.current_font, {"encoding": self.encoding}).get("encoding", self.encoding)
+            out.append(bytes.fromhex(self.hexes).decode(encoding=enc, errors=self.errors))
+            self.hexes = None
+        if brace:
+            self.curskip = 0
+            if brace == "{":
+                self.depth += 1
+                self.in_document = True
+                self.stack.append((self.ucskip, self.ignorable, self.suppress_output))
+            else:
+                self.depth -= 1
+                if self.stack:
+                    self.ucskip, self.ignorable, self.suppress_output = self.stack.pop()
+                else:
+                    self.ucskip = 0
+                    self.ignorable = True
+                if self._font_raw is not None and self.depth < self._font_depth:
+                    self._close_fonttbl()
+                if self.in_document and self.depth <= 0:
+                    self.done = True
+        elif char:
+            self.curskip = 0
+            if char in RTF_SPECIALCHARS:
+                if char in RTF_SECTIONCHARS:
+                    self.current_font = self.default_font
+                if not self.ignorable:
+                    out.append(RTF_SPECIALCHARS[char])
+            elif char == "*":
+                self.ignorable = True
+        elif word:
+            self.curskip = 0
+            if word == "bin" and arg:
+                self._bin_skip = max(int(arg), 0)
+                return
+            if word == "fonttbl" and self._font_raw is None and not self.fonttbl:
+                self._font_raw = ["{", m.group(0)]
+                self._font_depth = self.depth
+            if word in RTF_DESTINATIONS:
+                self.ignorable = True
+            elif word == "ansicpg":
+                self.encoding = f"cp{arg}"
+                try:
+                    codecs.lookup(self.encoding)
+                except LookupError:
+                    self.encoding = "utf8"
+            if self.ignorable or self.suppress_output:
+                pass
+            elif word in RTF_SPECIALCHARS:
+                out.append(RTF_SPECIALCHARS[word])
+            elif word == "uc":
+                self.ucskip = int(arg)
+            elif word == "u":
+                if arg is None:
+                    self.curskip = self.ucskip
+                else:
+                    c = int(arg)
+                    if c < 0:
+                        c += 0x10000
+                    out.append(chr(c))
+                    self.curskip = self.ucskip
+            elif word == "f":
+                self.current_font = arg
+            elif word == "deff":
+                self.default_font = arg
+            elif word == "fonttbl":
+                self.suppress_output = True
+            elif word == "colortbl":
+                self.suppress_output = True
+        elif _hex:
+            if self.curskip > 0:
+                self.curskip -= 1
+            elif not self.ignorable:
+                self.hexes = _hex if not self.hexes else self.hexes + _hex
+        elif tchar:
+            if self.curskip > 0:
+                self.curskip -= 1
+            elif not self.ignorable and not self.suppress_output:
+                out.append(tchar)
+
+    def feed(self, text: str, final: bool = False) -> str:
+        if self.done:
+            return ""
+        buf = self._buf + text
+        n = len(buf)
+        limit = n if final else n - self._TAIL
+        out: List[str] = []
+        pos = 0
+        while pos < limit and not self.done:
+            if self._bin_skip:
+                k = min(self._bin_skip, n - pos)
+                pos += k
+                self._bin_skip -= k
+                continue
+            if not self.hexes:
+                m = _RTF_PLAIN_RUN.match(buf, pos)
+                if m is not None:
+                    self._plain_run(m.group(0), out)
+                    pos = m.end()
+                    continue
+            m = RTF_TOKEN.match(buf, pos)
+            self._token(m, out)
+            pos = m.end()
+        self._buf = "" if self.done else buf[pos:]
+        return "".join(out)
+
+
+def _iter_raw_chunks(fp, size: int) -> Iterator[str]:
+    # 尽量在换行处切块，让 HYPERLINKS 预处理不跨块
+    rest = ""
+    while True:
+        block = fp.read(size)
+        if not block:
+            if rest:
+                yield rest
+            return
+        block = rest + block
+        cut = block.rfind("\n") + 1
+        if cut == 0:
+            yield block
+            rest = ""
+        else:
+            yield block[:cut]
+            rest = block[cut:]
+
+
+def iter_rtf_lines(source: Union[str, Path, BinaryIO], chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    流式把 RTF 转成文本行：逐块读取、逐块解码，每得到一个完整行就产出
+    （已做 _clean_line，空行省略——记录解析本来就会丢弃空行）。
+    """
+    if isinstance(source, (str, Path)):
+        raw = open(source, "rb")
+    else:
+        raw = source
+    fp = io.TextIOWrapper(raw, encoding="utf-8", errors="ignore", newline="")
+    decoder = RtfStreamDecoder()
+    pending = ""
+    try:
+        chunks = _iter_raw_chunks(fp, chunk_size)
+        for chunk in chunks:
+            pending += decoder.feed(HYPERLINKS.sub("\\1(\\2)", chunk))
+            *lines, pending = re.split(r"[\r\n]", pending)
+            for ln in lines:
+                ln = _clean_line(ln)
+                if ln:
+                    yield ln
+            if decoder.done:
+                break
+        pending += decoder.feed("", final=True)
+        for ln in re.split(r"[\r\n]", pending):
+            ln = _clean_line(ln)
+            if ln:
+                yield ln
+    finally:
+        fp.detach()
+        if raw is not source:
+            raw.close()
+
+
+def iter_records(source: Union[str, Path, BinaryIO]) -> Iterator[FactivaRecord]:
+    """
+    单遍流式解析 Factiva RTF：遇到 (END) 或文书 ID 行即切出一条记录并立刻产出，
+    与 parse_records_from_text(read_rtf_text(...)) 的结果一致，内存只与单条记录相关。
+    """
+    buf: List[str] = []
+    for ln in iter_rtf_lines(source):
+        if "(END)" in ln:
+            if buf:
+                rec = _parse_record_from_chunk(buf)
+                if rec and rec.body:
+                    yield rec
+                buf = []
+            continue
+        if DOC_ID.match(ln) and buf:
+            rec = _parse_record_from_chunk(buf)
+            if rec and rec.body:
+                yield rec
+            buf = [ln]
+            continue
+        buf.append(ln)
+    if buf:
+        rec = _parse_record_from_chunk(buf)
+        if rec and rec.body:
+            yield rec
@@ -0,0 +1,63 @@
+# coding: utf-8
+import os
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """
+    跨进程的排他文件锁（POSIX 用 flock，Windows 用 msvcrt.locking）。
+    进程退出时由操作系统自动释放，不会因为异常退出留下死锁。
+    磁盘缓存的写入方都通过它串行化：同一缓存目录同一时间只有一个进程在写。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+
+    def acquire(self, blocking: bool = True, timeout: float = 60.0) -> bool:
+        """取得锁；blocking=False 时锁被占用立即返回 False，否则最多等 timeout 秒。"""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return True
+            except OSError:
+                if not blocking or time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(0.05)
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        if not self.acquire():
+            raise TimeoutError(f"等待缓存锁超时：{self.path}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
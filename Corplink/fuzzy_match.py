@@ -0,0 +1,100 @@
+# coding: utf-8
+from collections import Counter, defaultdict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+Q = 3
+ALIAS_BLOCK = 64  # 每次 cdist 的别名数
+
+def _sort_tokens(s: str) -> str:
+    # 与 fuzz.token_sort_ratio 的预处理一致：按空白切分、排序后用单个空格连接
+    return " ".join(sorted(s.split()))
+
+def _qgrams(s: str) -> List[str]:
+    return [s[i:i + Q] for i in range(len(s) - Q + 1)]
+
+class FuzzyMatcher:
+    """
+    批量 fuzzy 匹配（token_sort_ratio）：
+      1) 字符三元组倒排索引 + 长度窗口筛出候选。筛选条件是必要条件
+         （q-gram 引理：Indel 距离为 d 时至少共享 max(la, lb) - Q + 1 - Q·d 个三元组），
+         不会漏掉任何得分 ≥ threshold 的名称；
+      2) 只对候选调用 rapidfuzz.process.cdist（多核）打分。
+    结果与逐条 process.extractOne(alias, names, scorer=fuzz.token_sort_ratio) 相同：
+    同分时取 names 中靠前的一个。
+    """
+
+    def __init__(self, names: Sequence[str], threshold: float = 90, workers: int = -1):
+        self.names = list(names)
+        self.threshold = threshold
+        self.workers = workers
+        self._sorted = [_sort_tokens(n) for n in self.names]
+        lens = np.fromiter((len(s) for s in self._sorted), dtype=np.int64, count=len(self._sorted))
+        # 内部按长度排序：长度窗口是一段连续区间，倒排表也可以按区间截取
+        self._order = np.argsort(lens, kind="stable")
+        self._lens = lens[self._order]
+        postings = defaultdict(list)
+        for pos, i in enumerate(self._order.tolist()):
+            for g, c in Counter(_qgrams(self._sorted[i])).items():
+                postings[g].extend([pos] * c)
+        self._postings = {g: np.asarray(p, dtype=np.int64) for g, p in postings.items()}
+
+    def _max_dist(self, total_len: np.ndarray) -> np.ndarray:
+        # 得分 = 100·(1 - d / (la + lb)) ≥ threshold  ⇔  d ≤ (1 - threshold/100)·(la + lb)
+        # 加一点余量，浮点误差只会多放进候选，不会漏
+        return np.floor((1 - self.threshold / 100) * total_len + 1e-6).astype(np.int64)
+
+    def candidates(self, alias: str) -> np.ndarray:
+        """可能达到 threshold 的名称下标（升序）。"""
+        s = _sort_tokens(alias)
+        la = len(s)
+        # |la - lb| ≤ d ≤ (1 - t)(la + lb) 给出 lb 的范围；先放宽一格取区间，再逐条精确判断
+        r = 1 - self.threshold / 100
+        lo = np.searchsorted(self._lens, la * (1 - r) / (1 + r) - 1, side="left")
+        hi = np.searchsorted(self._lens, la * (1 + r) / (1 - r) + 1 if r < 1 else np.inf, side="right")
+        lens = self._lens[lo:hi]
+        d_max = self._max_dist(la + lens)
+        ok = np.abs(lens - la) <= d_max
+        need = np.maximum(la, lens) - Q + 1 - Q * d_max
+        if (need[ok] > 0).any():
+            hits = []
+            for g in set(_qgrams(s)):
+                post = self._postings.get(g)
+                if post is not None:
+                    a, b = np.searchsorted(post, (lo, hi))
+                    hits.append(post[a:b])
+            # 每个三元组按名称中的出现次数累计：是共享三元组数的上界，筛选仍然安全
+            hits = np.concatenate(hits) - lo if hits else np.zeros(0, dtype=np.int64)
+            ok &= np.bincount(hits, minlength=hi - lo) >= need
+        return np.sort(self._order[lo + np.nonzero(ok)[0]])
+
+    def match(self, aliases: Sequence[str]) -> List[Optional[Tuple[str, float]]]:
+        """每个别名得分最高的名称及分数；低于 threshold 时为 None。"""
+        out: List[Optional[Tuple[str, float]]] = [None] * len(aliases)
+        if not self.names:
+            return out
+        # 长度相近的别名放在同一块，候选并集更小
+        order = sorted(range(len(aliases)), key=lambda i: len(aliases[i]))
+        for b in range(0, len(order), ALIAS_BLOCK):
+            block = order[b:b + ALIAS_BLOCK]
+            cands = [self.candidates(aliases[i]) for i in block]
+            union = np.unique(np.concatenate(cands)) if cands else np.zeros(0, dtype=np.int64)
+            if len(union) == 0:
+                continue
+            scores = process.cdist(
+                [_sort_tokens(aliases[i]) for i in block],
+                [self._sorted[j] for j in union],
+                scorer=fuzz.ratio,
+                score_cutoff=self.threshold,
+                dtype=np.float64,
+                workers=self.workers,
+            )
+            # argmax 取第一个最大值；union 升序，与 extractOne 的同分规则一致
+            best = scores.argmax(axis=1)
+            for row, (i, j) in enumerate(zip(block, best.tolist())):
+                score = float(scores[row, j])
+                if score >= self.threshold:
+                    out[i] = (self.names[union[j]], score)
+        return out
@@ -0,0 +1,99 @@
+# coding: utf-8
+from __future__ import annotations
+
+import io
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+from .constants import BASE_DIR
+
+@dataclass(frozen=True)
+class InputFile:
+    """
+    Step-1 的一个输入文件。archive 为空时 location 是磁盘路径；
+    否则 location 是该 zip 包内的成员路径（不解压到磁盘）。
+    """
+    location: str
+    tier1: str
+    tier2: str
+    filename: str
+    archive: str = ""
+
+    def source(self) -> Union[str, BinaryIO]:
+        """
+        返回解析器可直接使用的输入：磁盘文件给路径；zip 成员给流（用完由调用方关闭）。
+        .rtf 成员直接返回解压流（可 seek），哈希与流式解析各读一遍，不整体读入内存；
+        .docx 本身是 zip，解析时要随机访问，解压流上的 seek 需要从头重新解压，所以仍读入内存。
+        """
+        if not self.archive:
+            return self.location
+        zf = _open_archive(self.archive)
+        if self.location.lower().endswith(".docx"):
+            return io.BytesIO(zf.read(self.location))
+        return zf.open(self.location)
+
+    @property
+    def sort_key(self):
+        return (self.tier1, self.tier2, self.filename, self.location)
+
+# 每个进程只打开一次 zip，避免每个成员都重新读取中央目录。
+# 按 pid 区分：fork 出的 Step-1 子进程不能沿用主进程的句柄（共享同一个文件偏移，读取会互相错位）
+_ARCHIVES: Dict[Tuple[int, str], zipfile.ZipFile] = {}
+
+def _open_archive(path: str) -> zipfile.ZipFile:
+    key = (os.getpid(), path)
+    zf = _ARCHIVES.get(key)
+    if zf is None:
+        zf = _ARCHIVES[key] = zipfile.ZipFile(path)
+    return zf
+
+def _tiers(parts) -> tuple:
+    tier1 = parts[0] if len(parts) >= 1 else ""
+    tier2 = parts[1] if len(parts) >= 2 else ""
+    return tier1, tier2
+
+def list_directory_files(base_dir: Path, ext: str) -> List[InputFile]:
+    files = []
+    for root, _, names in os.walk(base_dir):
+        for fname in names:
+            if not fname.endswith(ext) or fname.startswith("~$"):
+                continue
+            full = Path(root) / fname
+            tier1, tier2 = _tiers(full.relative_to(base_dir).parts)
+            files.append(InputFile(str(full), tier1, tier2, fname))
+    return files
+
+def list_archive_files(archive: str, ext: str) -> List[InputFile]:
+    files = []
+    for info in _open_archive(archive).infolist():
+        if info.is_dir():
+            continue
+        member = PurePosixPath(info.filename)
+        fname = member.name
+        if not fname.endswith(ext) or fname.startswith("~$"):
+            continue
+        # macOS 打包时附带的资源分叉（__MACOSX/._xxx.docx）不是真正的文档
+        if member.parts[0] == "__MACOSX" or fname.startswith("._"):
+            continue
+        tier1, tier2 = _tiers(member.parts)
+        files.append(InputFile(info.filename, tier1, tier2, fname, archive=archive))
+    return files
+
+def list_input_files(ext: str, archive: str = "") -> List[InputFile]:
+    """
+    列出待处理的输入文件，按 Tier_1 / Tier_2 / Filename 排序。
+    指定 archive（zip 路径，相对路径以 BASE_DIR 为准）时直接遍历压缩包成员，
+    Tier 由成员路径推出，与解压到 BASE_DIR 后遍历的结果一致。
+    """
+    if archive:
+        path = Path(archive)
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        files = list_archive_files(str(path), ext)
+    else:
+        files = list_directory_files(BASE_DIR, ext)
+    files.sort(key=lambda f: f.sort_key)
+    return files
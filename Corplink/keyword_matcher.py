@@ -0,0 +1,88 @@
+# coding: utf-8
+import re
+from typing import Dict, List, Sequence, Set
+
+try:
+    import ahocorasick  # pyahocorasick（可选，C 实现的 Aho-Corasick 自动机）
+except ImportError:
+    ahocorasick = None
+
+def _trie_regex(words: Sequence[str]) -> str:
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _build(node: Dict) -> str:
+        kids = [re.escape(ch) + _build(child) for ch, child in sorted(node.items()) if ch]
+        if not kids:
+            return ""
+        body = kids[0] if len(kids) == 1 else "(?:" + "|".join(kids) + ")"
+        # 贪婪可选：优先匹配更长的词根，失败再回退到当前节点
+        return f"(?:{body})?" if "" in node else body
+
+    return _build(trie)
+
+class KeywordMatcher:
+    """
+    把 KEYWORD_ROOTS 编译成一个多模式自动机，每个句子只小写化一次、扫描一遍。
+    find() 的结果与 [k for k in roots if k in sent.lower()] 完全一致
+    （顺序与重复项都按原列表）。
+    """
+
+    def __init__(self, roots: Sequence[str]):
+        self.roots = list(roots)
+        self._root_idx: Dict[str, List[int]] = {}
+        for i, k in enumerate(self.roots):
+            self._root_idx.setdefault(k, []).append(i)
+        words = [k for k in self._root_idx if k]
+
+        self._automaton = None
+        self._pattern = None
+        if not words:
+            return
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for k in words:
+                self._automaton.add_word(k, k)
+            self._automaton.make_automaton()
+        else:
+            # 退化方案：把词根建成前缀树再转成零宽前瞻正则，每个位置只报告最长的词根；
+            # 同一位置上更短的词根必然是它的前缀，用 _prefix_roots 补齐
+            self._pattern = re.compile("(?=(" + _trie_regex(words) + "))")
+            self._prefix_roots = {
+                k: [k[:j] for j in range(1, len(k) + 1) if k[:j] in self._root_idx]
+                for k in words
+            }
+
+    def _matched_roots(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        if "" in self._root_idx:
+            found.add("")
+        if self._automaton is not None:
+            for _, k in self._automaton.iter(text):
+                found.add(k)
+        elif self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                found.update(self._prefix_roots[m.group(1)])
+        return found
+
+    def find(self, sent: str) -> List[str]:
+        found = self._matched_roots(sent.lower())
+        if not found:
+            return []
+        idxs = sorted(i for k in found for i in self._root_idx[k])
+        return [self.roots[i] for i in idxs]
+
+_MATCHER_CACHE: Dict[tuple, KeywordMatcher] = {}
+
+def get_keyword_matcher(roots: Sequence[str]) -> KeywordMatcher:
+    """同一组词根只编译一次（每个进程一次）。"""
+    key = tuple(roots)
+    m = _MATCHER_CACHE.get(key)
+    if m is None:
+        _MATCHER_CACHE.clear()
+        m = _MATCHER_CACHE[key] = KeywordMatcher(key)
+    return m
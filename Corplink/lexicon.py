@@ -0,0 +1,141 @@
+# coding: utf-8
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from .constants import ORG_SUFFIX, STOPWORDS
+
+# 词两端忽略的标点："Acme Holdings," 与 "Acme Holdings" 视为同一词序列
+_EDGE_PUNCT = ".,;:!?\"'()[]{}“”‘’"
+
+# 只看名称末尾的后缀（可连续多个）："Capital One"、"Bank of America" 不受影响
+_TRAILING_SUFFIX = re.compile(r"(?:^|[\s,]+)(" + ORG_SUFFIX.pattern + r")[\s.,]*$", re.I)
+# 只去掉 ORG_SUFFIX 中的法人形式与 Group/Holdings；业务/机构类的词保留：
+# "Acme Capital" ≠ "Acme"，"Stanford University" ≠ "Stanford Hospital"
+_LEGAL_FORM = re.compile(r"(?:Inc|Corp|Ltd|Co)\.?|Corporation|LLC|PLC|AG|NV|SA|GmbH|S\.p\.A|Company|"
+                         r"Group|Holdings?", re.I)
+_NON_WORD = re.compile(r"[\W_]+")
+# 去掉后缀后太短的键过于宽泛（"The Company" → "the"），不用于匹配
+_MIN_KEY_LEN = 3
+
+def _phrase_tokens(s: str) -> List[str]:
+    return [t.strip(_EDGE_PUNCT).lower() for t in s.split()]
+
+def normalized_key(name: str) -> str:
+    """
+    名称的归一化键：去掉末尾后缀、去掉标点和空白、casefold。
+    "Apple Inc." / "apple" / "APPLE, INC" → "apple"。
+    整个名称都是后缀、或剩下的部分不足 _MIN_KEY_LEN 个字符或是停用词时返回空串（不参与匹配）。
+    """
+    s = name.strip()
+    while True:
+        m = _TRAILING_SUFFIX.search(s)
+        if m is None or not _LEGAL_FORM.fullmatch(m.group(1)):
+            break
+        if m.start() == 0:
+            return ""
+        s = s[:m.start()]
+    key = _NON_WORD.sub("", s).casefold()
+    if len(key) < _MIN_KEY_LEN or key in STOPWORDS:
+        return ""
+    return key
+
+class CompanyLexicon:
+    """
+    公司词典：company_canonical + company_alias（+ ban_list），每次运行从数据库构建一次，
+    Step-2 与 Step-3 共用。
+      - 单词查询：小写哈希集合，`token in lexicon` 为 O(1)；
+      - 多词名称：按首词分桶的短语表，find_phrases() 在句子中找出已知的多词公司名（最长匹配）。
+    """
+
+    def __init__(self,
+                 canonicals: Optional[Dict[int, str]] = None,
+                 aliases: Optional[Dict[str, str]] = None,
+                 bans: Iterable[str] = ()):
+        self.canon_id2name: Dict[int, str] = dict(canonicals or {})
+        self.alias_map: Dict[str, str] = dict(aliases or {})   # alias → canonical_name
+        self.ban_set: Set[str] = set(bans)
+        self.canon_set: Set[str] = set(self.canon_id2name.values())
+
+        self.ban_lower: Set[str] = {b.lower() for b in self.ban_set}
+        self.canon_lower2orig: Dict[str, str] = {c.lower(): c for c in self.canon_set}
+        self.canon_lower2id: Dict[str, int] = {n.lower(): cid for cid, n in self.canon_id2name.items()}
+        self.alias_lower: Dict[str, str] = {a.lower(): c for a, c in self.alias_map.items()}
+
+        self._names_lower: Set[str] = set(self.canon_lower2orig) | set(self.alias_lower)
+        self._norm_key2id: Optional[Dict[str, Optional[int]]] = None
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        self._max_len: Dict[str, int] = {}
+        for name in list(self.canon_set) + list(self.alias_map):
+            toks = tuple(_phrase_tokens(name))
+            if len(toks) < 2 or not all(toks):
+                continue
+            self._phrases.setdefault(toks, name)
+            self._max_len[toks[0]] = max(self._max_len.get(toks[0], 0), len(toks))
+
+    @classmethod
+    def from_db(cls, conn) -> "CompanyLexicon":
+        canonicals = {cid: name for cid, name in conn.execute(text(
+            "SELECT id, canonical_name FROM company_canonical"
+        ))}
+        aliases = {alias: canon for alias, canon in conn.execute(text(
+            "SELECT a.alias, c.canonical_name FROM company_alias a "
+            "JOIN company_canonical c ON a.canonical_id = c.id"
+        ))}
+        bans = [r[0] for r in conn.execute(text("SELECT alias FROM ban_list"))]
+        return cls(canonicals, aliases, bans)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "CompanyLexicon":
+        """只用于名称匹配（兼容旧的 company_db 列表参数）。"""
+        return cls(aliases={n: n for n in names})
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._names_lower
+
+    def __len__(self) -> int:
+        return len(self._names_lower)
+
+    def resolve_normalized(self, name: str) -> Optional[int]:
+        """
+        按归一化键（见 normalized_key）找对应的 canonical id，O(1)。
+        键由 canonical 与 alias 共同构成；同一个键对应多个 canonical 时视为有歧义，返回 None。
+        """
+        if self._norm_key2id is None:
+            key2id: Dict[str, Optional[int]] = {}
+            pairs = list(self.canon_id2name.items())
+            pairs += [(self.canon_lower2id.get(c.lower()), a) for a, c in self.alias_map.items()]
+            for cid, n in pairs:
+                key = normalized_key(n)
+                if cid is None or not key:
+                    continue
+                if key in key2id and key2id[key] != cid:
+                    key2id[key] = None
+                else:
+                    key2id.setdefault(key, cid)
+            self._norm_key2id = key2id
+        key = normalized_key(name)
+        return self._norm_key2id.get(key) if key else None
+
+    def find_phrases(self, sentence: str) -> List[str]:
+        """
+        返回句中出现的已知多词公司名（数据库里的写法），按出现顺序、不重叠、同一位置取最长。
+        """
+        if not self._phrases:
+            return []
+        toks = _phrase_tokens(sentence)
+        found: List[str] = []
+        i = 0
+        while i < len(toks):
+            longest = self._max_len.get(toks[i], 0)
+            step = 1
+            for n in range(min(longest, len(toks) - i), 1, -1):
+                name = self._phrases.get(tuple(toks[i:i + n]))
+                if name is not None:
+                    if name not in found:
+                        found.append(name)
+                    step = n
+                    break
+            i += step
+        return found
@@ -0,0 +1,85 @@
+# coding: utf-8
+from __future__ import annotations
+
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, List, Union
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCUMENT = W_NS + "document"
+_BODY = W_NS + "body"
+_P = W_NS + "p"
+_R = W_NS + "r"
+_HYPERLINK = W_NS + "hyperlink"
+
+# 与 python-docx 的 Run.text 保持一致的 run 子元素
+_T = W_NS + "t"
+_TAB = W_NS + "tab"
+_PTAB = W_NS + "ptab"
+_BR = W_NS + "br"
+_CR = W_NS + "cr"
+_NO_BREAK_HYPHEN = W_NS + "noBreakHyphen"
+
+def _run_child_text(el: ET.Element) -> str:
+    tag = el.tag
+    if tag == _T:
+        return el.text or ""
+    if tag in (_TAB, _PTAB):
+        return "\t"
+    if tag == _BR:
+        return "\n" if el.get(W_NS + "type", "textWrapping") == "textWrapping" else ""
+    if tag == _CR:
+        return "\n"
+    if tag == _NO_BREAK_HYPHEN:
+        return "-"
+    return ""
+
+def iter_paragraph_texts(source: Union[str, BinaryIO]) -> Iterator[str]:
+    """
+    直接从 docx 压缩包中流式解析 word/document.xml，逐段产出正文段落文本。
+    只取 body 直属的 <w:p>（与 python-docx 的 doc.paragraphs 相同，不含表格内段落），
+    段落文本只拼接一次。
+    """
+    with zipfile.ZipFile(source) as zf, zf.open("word/document.xml") as fp:
+        stack: List[str] = []
+        parts: List[str] = []
+        body = None
+        for event, el in ET.iterparse(fp, events=("start", "end")):
+            if event == "start":
+                stack.append(el.tag)
+                if el.tag == _BODY and len(stack) == 2:
+                    body = el
+                elif el.tag == _P and len(stack) == 3:
+                    parts = []
+                continue
+
+            stack.pop()
+            depth = len(stack)
+            if depth == 2 and el.tag == _P and stack[0] == _DOCUMENT and stack[1] == _BODY:
+                yield "".join(parts)
+                # 已处理的段落及时释放，内存只与单个段落相关
+                if body is not None:
+                    body.clear()
+                continue
+            if depth < 4 or stack[0] != _DOCUMENT or stack[1] != _BODY or stack[2] != _P:
+                continue
+            if (depth == 4 and stack[3] == _R) or \
+               (depth == 5 and stack[3] == _HYPERLINK and stack[4] == _R):
+                parts.append(_run_child_text(el))
+
+def read_paragraph_texts(source: Union[str, BinaryIO]) -> List[str]:
+    """
+    读取 Lexis docx 的全部段落文本。优先使用流式解析；
+    遇到非常规文件（Strict OOXML、损坏的压缩包等）时回退到 python-docx。
+    """
+    try:
+        texts = list(iter_paragraph_texts(source))
+        if texts:
+            return texts
+    except Exception:
+        pass
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    from docx import Document
+    return [p.text for p in Document(source).paragraphs]
@@ -2,7 +2,7 @@
 
 from sqlalchemy import create_engine
 from .env_bootstrap import cute_box
-from .config import ask_mysql_url, wizard, apply_options_to_state
+from .config import ask_mysql_url, wizard, apply_options_to_state, WEB_CONFIG
 from .options import AILevel
 from .constants import BASE_DIR
 
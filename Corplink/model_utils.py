@@ -1,38 +1,204 @@
 # coding: utf-8
+import importlib.util
+import threading
+from importlib import metadata
+from typing import List, Sequence
+
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
-import spacy
 
+from . import state
 from .constants import NOISE_CONCEPTS, ORG_SUFFIX, TIME_QTY, FIN_REPORT
+from .embed_cache import EmbeddingCache
 from .text_utils import _lower_ratio
 
-nlp = spacy.load("en_core_web_sm", disable=["parser", "lemmatizer"])
-model_emb = SentenceTransformer(
-    "sentence-transformers/all-MiniLM-L6-v2",
-    device="cuda" if torch.cuda.is_available() else "cpu"
-)
+EMB_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMB_DIM = 384  # all-MiniLM-L6-v2 的向量维度；打开向量缓存不必先加载模型
+NER_MODEL_NAME = "en_core_web_sm"
 
-print("⏳ 正在预计算垃圾词向量...")
-noise_vecs = model_emb.encode(NOISE_CONCEPTS, normalize_embeddings=True)
+# 句向量后端：torch（fp32，默认）/ int8（torch 动态量化，仅 CPU）/ onnx（onnxruntime，仅 CPU）
+EMB_BACKENDS = ("torch", "int8", "onnx")
+_BACKEND_DEPS = {"onnx": ("onnxruntime", "optimum")}
+_BACKEND_MIN_ST = {"onnx": "3.2"}  # SentenceTransformer(backend=...) 从 sentence-transformers 3.2 开始提供
 
-def calc_Bad_Score(text: str) -> int:
-    score = 0
-    if ORG_SUFFIX.search(text): 
-        return 0
+# 模型在第一次用到时才加载（torch / sentence_transformers / spacy 也在那时才 import）：
+# 只跑 Step3-4、或者所需向量全部命中缓存时，进程不会碰到这些依赖。
+_load_lock = threading.Lock()
+_nlp = None
+_model_emb = None
+_noise_vecs = None
+_emb_backend = None
+
+def get_nlp():
+    """spaCy NER 模型（en_core_web_sm，关闭 parser / lemmatizer），首次调用时加载。"""
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(NER_MODEL_NAME, disable=["parser", "lemmatizer"])
+    return _nlp
+
+def _version_at_least(pkg: str, minimum: str) -> bool:
+    from packaging.version import Version
+    try:
+        return Version(metadata.version(pkg)) >= Version(minimum)
+    except (metadata.PackageNotFoundError, ValueError):
+        return False
+
+def emb_backend() -> str:
+    """本进程实际使用的句向量后端：state.EMB_BACKEND，所需依赖未安装时退回 torch。"""
+    global _emb_backend
+    if _emb_backend is None:
+        backend = state.EMB_BACKEND if state.EMB_BACKEND in EMB_BACKENDS else "torch"
+        missing = [m for m in _BACKEND_DEPS.get(backend, ()) if importlib.util.find_spec(m) is None]
+        min_st = _BACKEND_MIN_ST.get(backend)
+        if min_st and not _version_at_least("sentence-transformers", min_st):
+            missing.append(f"sentence-transformers>={min_st}")
+        if missing:
+            print(f"⚠️ 句向量后端 {backend} 需要 {', '.join(missing)}，本次改用 torch")
+            backend = "torch"
+        _emb_backend = backend
+    return _emb_backend
+
+def emb_model_key() -> str:
+    """向量缓存与 canonical 索引的模型键：各后端的向量有细微差别，分开存放。"""
+    backend = emb_backend()
+    return EMB_MODEL_NAME if backend == "torch" else f"{EMB_MODEL_NAME}@{backend}"
+
+def load_embedder(backend: str = "torch"):
+    """按后端新建一个 SentenceTransformer（不做缓存；基准脚本用它并排比较各后端）。"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        return SentenceTransformer(EMB_MODEL_NAME, device="cpu", backend="onnx")
+    if backend == "int8":
+        model = SentenceTransformer(EMB_MODEL_NAME, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return SentenceTransformer(EMB_MODEL_NAME, device="cuda" if torch.cuda.is_available() else "cpu")
+
+def get_model_emb():
+    """句向量模型（按 emb_backend() 加载），首次调用时加载。"""
+    global _model_emb
+    if _model_emb is None:
+        backend = emb_backend()
+        with _load_lock:
+            if _model_emb is None:
+                print(f"⏳ 正在加载句向量模型（{backend}）...")
+                model = load_embedder(backend)
+                dim = model.get_sentence_embedding_dimension()
+                if dim != EMB_DIM:
+                    raise RuntimeError(f"{EMB_MODEL_NAME} 的向量维度为 {dim}，与 EMB_DIM={EMB_DIM} 不一致")
+                _model_emb = model
+    return _model_emb
+
+def ner_model_version() -> str:
+    """spaCy 与 NER 模型的版本（读包元数据，不加载模型）；NER 缓存据此判断是否作废。"""
+    def _version(pkg: str) -> str:
+        try:
+            return metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            return ""
+    return f"spacy={_version('spacy')};model={NER_MODEL_NAME}-{_version(NER_MODEL_NAME)}"
 
-    if TIME_QTY.search(text): score += 30
-    if FIN_REPORT.search(text): score += 30
-    if len(text.split()) <= 2: score += 10
-    if _lower_ratio(text) > 0.30: score += 10
+def __getattr__(name):
+    # 兼容旧写法 `from .model_utils import nlp / model_emb / noise_vecs`（会在此时加载模型）
+    if name == "nlp":
+        return get_nlp()
+    if name == "model_emb":
+        return get_model_emb()
+    if name == "noise_vecs":
+        return get_noise_vecs()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    if score > 0 or len(text.split()) > 2:
-        text_vec = model_emb.encode([text], normalize_embeddings=True)[0]
-        sims = np.dot(noise_vecs, text_vec)
-        max_sim = float(np.max(sims))
+_embed_cache = None
+_embed_cache_failed = False
 
-        if max_sim > 0.4: score += 20
-        if max_sim > 0.6: score += 40
-        if max_sim > 0.8: score += 100
+def _get_embed_cache():
+    global _embed_cache, _embed_cache_failed
+    if _embed_cache is None and not _embed_cache_failed:
+        with _load_lock:
+            if _embed_cache is None and not _embed_cache_failed:
+                try:
+                    _embed_cache = EmbeddingCache(
+                        emb_model_key(),
+                        EMB_DIM,
+                        max(1, state.EMBED_CACHE_MAX_MB) << 20,
+                    )
+                except Exception as e:
+                    _embed_cache_failed = True
+                    print(f"⚠️ 向量缓存不可用，本次不使用缓存（不影响结果）: {e}")
+    return _embed_cache
 
-    return score
\ No newline at end of file
+def encode_texts(texts, batch_size: int = 32) -> np.ndarray:
+    """
+    所有句向量都经由这里计算（normalize_embeddings=True）：
+    先查磁盘向量缓存，只把没见过的文本交给 model_emb 编码；全部命中时不加载模型。
+    """
+    global _embed_cache, _embed_cache_failed
+    texts = list(texts)
+
+    def _encode(batch):
+        return get_model_emb().encode(batch, batch_size=batch_size, normalize_embeddings=True)
+
+    if not texts:
+        return np.zeros((0, EMB_DIM), dtype=np.float32)
+    cache = _get_embed_cache() if state.USE_EMBED_CACHE else None
+    if cache is not None:
+        try:
+            return cache.encode(texts, _encode)
+        except Exception as e:
+            _embed_cache, _embed_cache_failed = None, True
+            print(f"⚠️ 向量缓存读写失败，改为直接编码（不影响结果）: {e}")
+    return np.asarray(_encode(texts), dtype=np.float32)
+
+def embed_cache_stats():
+    """本进程内向量缓存的 (命中数, 未命中数)；未启用缓存时为 None。"""
+    if _embed_cache is None or not state.USE_EMBED_CACHE:
+        return None
+    return _embed_cache.hits, _embed_cache.misses
+
+def get_noise_vecs() -> np.ndarray:
+    """垃圾词概念向量（NOISE_CONCEPTS），第一次打分时计算。"""
+    global _noise_vecs
+    if _noise_vecs is None:
+        print("⏳ 正在预计算垃圾词向量...")
+        vecs = encode_texts(NOISE_CONCEPTS)
+        with _load_lock:
+            if _noise_vecs is None:
+                _noise_vecs = vecs
+    return _noise_vecs
+
+def calc_Bad_Score_batch(texts: Sequence[str]) -> List[int]:
+    """
+    calc_Bad_Score 的批量版：正则特征逐条计算；需要语义检查的别名去重后
+    一次性编码，与垃圾词向量做一次矩阵乘得到各自的最大相似度。
+    """
+    scores = [0] * len(texts)
+    need_sem: List[int] = []
+    for i, text in enumerate(texts):
+        if ORG_SUFFIX.search(text):
+            continue
+        score = 0
+        if TIME_QTY.search(text): score += 30
+        if FIN_REPORT.search(text): score += 30
+        if len(text.split()) <= 2: score += 10
+        if _lower_ratio(text) > 0.30: score += 10
+        scores[i] = score
+        if score > 0 or len(text.split()) > 2:
+            need_sem.append(i)
+
+    if need_sem:
+        uniq = list(dict.fromkeys(texts[i] for i in need_sem))
+        max_sims = (encode_texts(uniq) @ get_noise_vecs().T).max(axis=1)
+        sim_of = dict(zip(uniq, max_sims.tolist()))
+        for i in need_sem:
+            max_sim = sim_of[texts[i]]
+            if max_sim > 0.4: scores[i] += 20
+            if max_sim > 0.6: scores[i] += 40
+            if max_sim > 0.8: scores[i] += 100
+
+    return scores
+
+def calc_Bad_Score(text: str) -> int:
+    return calc_Bad_Score_batch([text])[0]
@@ -0,0 +1,69 @@
+# coding: utf-8
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .constants import CACHE_DIR
+from .file_lock import FileLock
+
+CACHE_ROOT = CACHE_DIR / "ner"
+
+_QUERY_CHUNK = 500  # 单条 SELECT ... IN (...) 的参数个数
+
+class NerCache:
+    """
+    句子 → NER 结果（与词典无关的部分）的磁盘缓存：ner.sqlite 里 sentence_key → JSON 名称列表。
+    namespace 由 spaCy 模型名/版本与抽取规则版本组成，变化时整表作废。
+    """
+
+    def __init__(self, namespace: str, root: Path = CACHE_ROOT):
+        Path(root).mkdir(parents=True, exist_ok=True)
+        # namespace 变化时会整表清空：同一时间只允许一个进程使用，拿不到锁时调用方本次不用缓存
+        self._lock = FileLock(Path(root) / "lock")
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError(f"{root} 正被另一个进程使用")
+        self._db = sqlite3.connect(str(Path(root) / "ner.sqlite"))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, names TEXT)")
+        row = self._db.execute("SELECT v FROM meta WHERE k = 'namespace'").fetchone()
+        if row is None or row[0] != namespace:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('namespace', ?)", (namespace,))
+        self._db.commit()
+        self._buffer: List[Tuple[bytes, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, List[str]]:
+        keys = list(keys)
+        self.flush()  # 还在缓冲里的结果也要能查到
+        found: Dict[bytes, List[str]] = {}
+        for i in range(0, len(keys), _QUERY_CHUNK):
+            part = keys[i:i + _QUERY_CHUNK]
+            marks = ",".join("?" * len(part))
+            for key, names in self._db.execute(
+                f"SELECT key, names FROM entries WHERE key IN ({marks})", part
+            ):
+                found[bytes(key)] = json.loads(names)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: bytes, names: List[str]) -> None:
+        self._buffer.append((key, json.dumps(names, ensure_ascii=False)))
+        if len(self._buffer) >= 1000:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?)", self._buffer)
+            self._db.commit()
+            self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+        self._lock.release()
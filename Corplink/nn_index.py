@@ -0,0 +1,307 @@
+# coding: utf-8
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+import numpy as np
+
+from .constants import CACHE_DIR
+from .file_lock import FileLock
+
+CANON_INDEX_ROOT = CACHE_DIR / "canon_index"
+
+# 分块矩阵乘时每块最多 16M 个相似度（float32 约 64MB）
+SIM_BLOCK_ELEMS = 1 << 24
+
+def _blocked_argmax(queries: np.ndarray, vecs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    best_pos = np.zeros(len(queries), dtype=np.int64)
+    best_sim = np.full(len(queries), -np.inf, dtype=np.float32)
+    if len(vecs) == 0:
+        return best_pos, best_sim
+    rows = max(1, SIM_BLOCK_ELEMS // len(vecs))
+    for i in range(0, len(queries), rows):
+        sims = queries[i:i + rows] @ vecs.T
+        pos = sims.argmax(axis=1)
+        best_pos[i:i + rows] = pos
+        best_sim[i:i + rows] = sims[np.arange(len(pos)), pos]
+    return best_pos, best_sim
+
+class NNIndex(ABC):
+    """
+    canonical 向量的最近邻索引（内积 = 余弦相似度，向量已归一化）。
+    以 canonical id 为键，支持增量 add / remove，可整体存盘、读盘。
+    子类只需实现 search（以及需要时的 _on_add / _on_remove / 额外存盘字段）。
+    """
+
+    backend = ""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vecs = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: Iterable[int], vecs: np.ndarray) -> None:
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) == 0:
+            return
+        vecs = np.asarray(vecs, dtype=np.float32).reshape(len(ids), self.dim)
+        # 已存在的 id 视为更新（例如改名后重新编码）
+        self.remove(ids)
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, ids])
+        self.vecs = np.concatenate([self.vecs, vecs])
+        self._on_add(start)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) == 0 or len(self.ids) == 0:
+            return
+        keep = ~np.isin(self.ids, ids)
+        if keep.all():
+            return
+        self.ids = self.ids[keep]
+        self.vecs = self.vecs[keep]
+        self._on_remove(keep)
+
+    def _on_add(self, start: int) -> None:
+        pass
+
+    def _on_remove(self, keep: np.ndarray) -> None:
+        pass
+
+    @abstractmethod
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """每个查询向量的最近邻：返回 (canonical id, 相似度)。索引为空时相似度为 -inf。"""
+
+    # ---- 存盘 ----
+    def _extra_arrays(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def _load_extra(self, arrays: Dict[str, np.ndarray], meta: Dict) -> None:
+        pass
+
+    def save(self, path: Path, meta: Optional[Dict] = None) -> None:
+        """写入目录 path：先写临时文件再替换，中途失败不会留下半截索引。"""
+        path.mkdir(parents=True, exist_ok=True)
+        arrays = {"ids": self.ids, "vecs": self.vecs, **self._extra_arrays()}
+        for name, arr in arrays.items():
+            tmp = path / f"{name}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, path / f"{name}.npy")
+        info = {"backend": self.backend, "dim": self.dim, "count": len(self.ids), **(meta or {})}
+        tmp = path / "meta.json.tmp"
+        tmp.write_text(json.dumps(info, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path / "meta.json")
+
+    @staticmethod
+    def read_meta(path: Path) -> Optional[Dict]:
+        try:
+            return json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+class ExactIndex(NNIndex):
+    """精确检索：分块 NumPy 矩阵乘。"""
+
+    backend = "exact"
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        pos, sims = _blocked_argmax(queries, self.vecs)
+        ids = self.ids[pos] if len(self.ids) else np.zeros(len(queries), dtype=np.int64)
+        return ids, sims
+
+class IVFIndex(NNIndex):
+    """
+    近似检索（IVF）：球面 k-means 把向量分成 nlist 个簇，查询只扫描最相近的 nprobe 个簇。
+    新增向量直接归入最近的簇；规模比上次训练时翻倍后重新训练。
+    向量少于 min_train 时退化为精确检索。
+    """
+
+    backend = "ivf"
+    min_train = 4096
+
+    def __init__(self, dim: int, nprobe: int = 8, seed: int = 0):
+        super().__init__(dim)
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.assign = np.zeros(0, dtype=np.int64)
+        self.trained_on = 0
+
+    def train(self, n_iter: int = 10) -> None:
+        n = len(self.vecs)
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.RandomState(self.seed)
+        sample = self.vecs[rng.choice(n, size=min(n, nlist * 64), replace=False)]
+        cents = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            assign, _ = _blocked_argmax(sample, cents)
+            sums = np.zeros_like(cents)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # 空簇重新随机取一个样本点
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            cents = sums / norms[:, None]
+        self.centroids = cents.astype(np.float32)
+        self.assign, _ = _blocked_argmax(self.vecs, self.centroids)
+        self.trained_on = n
+
+    def _on_add(self, start: int) -> None:
+        n = len(self.vecs)
+        if n < self.min_train:
+            self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+            self.assign = np.zeros(n, dtype=np.int64)
+            self.trained_on = 0
+            return
+        if self.trained_on == 0 or n >= 2 * self.trained_on:
+            self.train()
+            return
+        new_assign, _ = _blocked_argmax(self.vecs[start:], self.centroids)
+        self.assign = np.concatenate([self.assign, new_assign])
+
+    def _on_remove(self, keep: np.ndarray) -> None:
+        self.assign = self.assign[keep]
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        if self.trained_on == 0:
+            pos, sims = _blocked_argmax(queries, self.vecs)
+            ids = self.ids[pos] if len(self.ids) else np.zeros(len(queries), dtype=np.int64)
+            return ids, sims
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        best_pos = np.zeros(len(queries), dtype=np.int64)
+        best_sim = np.full(len(queries), -np.inf, dtype=np.float32)
+        order = np.argsort(self.assign, kind="stable")
+        bounds = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+
+        rows = max(1, SIM_BLOCK_ELEMS // max(len(self.centroids), 1))
+        for q0 in range(0, len(queries), rows):
+            q = queries[q0:q0 + rows]
+            cs = q @ self.centroids.T
+            probes = np.argpartition(-cs, nprobe - 1, axis=1)[:, :nprobe]
+            # 按簇批量计算：每个簇只与探测到它的查询做一次矩阵乘
+            for lst in np.unique(probes):
+                members = order[bounds[lst]:bounds[lst + 1]]
+                if len(members) == 0:
+                    continue
+                qi = np.nonzero((probes == lst).any(axis=1))[0]
+                sims = q[qi] @ self.vecs[members].T
+                j = sims.argmax(axis=1)
+                s = sims[np.arange(len(j)), j]
+                better = s > best_sim[q0 + qi]
+                best_sim[q0 + qi[better]] = s[better]
+                best_pos[q0 + qi[better]] = members[j[better]]
+        return self.ids[best_pos], best_sim
+
+    def _extra_arrays(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids, "assign": self.assign}
+
+    def _load_extra(self, arrays: Dict[str, np.ndarray], meta: Dict) -> None:
+        self.centroids = arrays["centroids"]
+        self.assign = arrays["assign"]
+        self.trained_on = int(meta.get("trained_on", 0))
+
+    def save(self, path: Path, meta: Optional[Dict] = None) -> None:
+        super().save(path, {"trained_on": self.trained_on, **(meta or {})})
+
+NN_BACKENDS: Dict[str, Type[NNIndex]] = {
+    ExactIndex.backend: ExactIndex,
+    IVFIndex.backend: IVFIndex,
+}
+
+def new_index(backend: str, dim: int, nprobe: int = 8) -> NNIndex:
+    cls = NN_BACKENDS.get(backend)
+    if cls is None:
+        raise ValueError(f"unknown nearest-neighbour backend: {backend}")
+    if cls is IVFIndex:
+        return cls(dim, nprobe=nprobe)
+    return cls(dim)
+
+def load_index(path: Path, backend: str, dim: int, nprobe: int = 8) -> Optional[NNIndex]:
+    """读取已存盘的索引；不存在、维度或后端不一致、文件损坏时返回 None。"""
+    meta = NNIndex.read_meta(path)
+    if not meta or meta.get("backend") != backend or int(meta.get("dim", -1)) != dim:
+        return None
+    index = new_index(backend, dim, nprobe)
+    try:
+        arrays = {f.stem: np.load(f) for f in path.glob("*.npy") if not f.stem.endswith(".tmp")}
+        index.ids = arrays["ids"].astype(np.int64)
+        index.vecs = arrays["vecs"].astype(np.float32)
+        index._load_extra(arrays, meta)
+    except (OSError, KeyError, ValueError):
+        return None
+    if len(index.ids) != len(index.vecs):
+        return None
+    return index
+
+def canon_index_dir(model_name: str, backend: str) -> Path:
+    """canonical 索引的存盘目录：每个向量模型、每种后端各一份。"""
+    return CANON_INDEX_ROOT / re.sub(r"[^\w.-]+", "_", model_name) / backend
+
+def open_canon_index(model_name: str, backend: str,
+                     nprobe: int = 8) -> Tuple[Optional[NNIndex], Dict[int, str]]:
+    """
+    读取已存盘的 canonical 索引及其对应的 {canonical id: 名称}。
+    没有存盘、模型不一致或文件不完整时返回 (None, {})，由调用方整体重建。
+    """
+    path = canon_index_dir(model_name, backend)
+    # 与 save_canon_index 互斥：不会读到另一个进程写了一半的 names.json / *.npy 组合
+    lock = FileLock(path.parent / f"{backend}.lock")
+    try:
+        if not lock.acquire():
+            return None, {}
+        meta = NNIndex.read_meta(path)
+        if not meta or meta.get("model") != model_name:
+            return None, {}
+        index = load_index(path, backend, int(meta.get("dim", 0)), nprobe)
+        names = {int(k): v for k, v in json.loads((path / "names.json").read_text(encoding="utf-8")).items()}
+    except (OSError, ValueError):
+        return None, {}
+    finally:
+        lock.release()
+    if index is None or set(names) != set(index.ids.tolist()):
+        return None, {}
+    return index, names
+
+def save_canon_index(index: NNIndex, model_name: str, names: Dict[int, str]) -> None:
+    path = canon_index_dir(model_name, index.backend)
+    path.mkdir(parents=True, exist_ok=True)
+    with FileLock(path.parent / f"{index.backend}.lock"):
+        tmp = path / "names.json.tmp"
+        tmp.write_text(json.dumps({str(k): v for k, v in names.items()}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path / "names.json")
+        index.save(path, {"model": model_name})
+
+def sync_canon_index(index: Optional[NNIndex], names: Dict[int, str],
+                     canon_id2name: Dict[int, str],
+                     encode: Callable[[List[str]], np.ndarray],
+                     backend: str, nprobe: int = 8) -> Tuple[NNIndex, int, int]:
+    """
+    让索引与当前 company_canonical 一致，只编码有变化的行：
+    新增的 id（上次同步之后写入的）与改了名的 id 重新编码加入，库里已删除的 id 移除。
+    names 会被原地更新。返回 (索引, 新增/更新数, 删除数)。
+    """
+    changed = [cid for cid, name in canon_id2name.items() if names.get(cid) != name]
+    stale = [cid for cid in names if cid not in canon_id2name]
+    if changed:
+        vecs = np.asarray(encode([canon_id2name[cid] for cid in changed]), dtype=np.float32)
+        if index is None:
+            index = new_index(backend, vecs.shape[1], nprobe)
+        index.add(changed, vecs)
+        names.update((cid, canon_id2name[cid]) for cid in changed)
+    if index is None:
+        index = new_index(backend, 0, nprobe)
+    index.remove(stale)
+    for cid in stale:
+        del names[cid]
+    return index, len(changed), len(stale)
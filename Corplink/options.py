@@ -22,3 +22,18 @@ class RunOptions:
     custom_keywords: Optional[List[str]] = None
     ai_level: AILevel = AILevel.MANUAL
     extract_mode: ExtractMode = ExtractMode.LEXIS
+    extract_workers: int = 1  # Step-1 并行进程数；0 = CPU 核数
+    record_chunk_size: int = 5000  # Step-1 → Step-2 每批句子数
+    ner_batch_size: int = 256  # Step-2 spaCy nlp.pipe 批大小
+    ner_processes: int = 1  # Step-2 spaCy 进程数；-1 = CPU 核数
+    ner_prefilter: bool = False  # 规则预筛（近似）：跳过估计不足 2 个公司的句子，可能漏掉名称
+    use_ner_cache: bool = True  # 跨运行缓存句子的 NER 结果
+    use_extract_cache: bool = True  # 按文件内容哈希缓存解析结果
+    input_archive: str = ""  # 直接读取的输入 zip（不解压到磁盘）
+    semantic_batch_size: int = 1024  # 语义过滤每批编码的句子数
+    dedup_articles: bool = False  # 跳过近重复（转载）文章；被跳过的行只记在 article_duplicates.csv
+    dedup_threshold: float = 0.8
+    use_embed_cache: bool = True  # 句向量磁盘缓存
+    embed_cache_max_mb: int = 512  # 向量缓存上限，超出按 LRU 淘汰
+    nn_backend: str = "exact"  # canonical 最近邻：exact / ivf
+    nn_nprobe: int = 8  # ivf 每次查询扫描的簇数
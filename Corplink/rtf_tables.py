@@ -0,0 +1,126 @@
+# coding: utf-8
+"""
+RTF 解码用的控制字表与正则，取自 striprtf 0.0.33（BSD-3-Clause，https://github.com/joshy/striprtf）。
+RtfStreamDecoder 按这些表逐块解码；放在本仓库里，不依赖 striprtf 的内部名称，
+striprtf 升级改动内部实现时流式解码不受影响。与 striprtf 公开的 rtf_to_text 的一致性
+由 benchmarks/bench_factiva_stream.py 核对。
+"""
+import re
+
+# \u8868\u793A\u201C\u76EE\u6807\u201D\uFF08destination\uFF09\u7684\u63A7\u5236\u5B57\uFF1A\u6240\u5728\u5206\u7EC4\u6574\u4F53\u5FFD\u7565
+DESTINATIONS = frozenset((
+    "aftncn", "aftnsep", "aftnsepc", "annotation", "atnauthor", "atndate", "atnicn", "atnid",
+    "atnparent", "atnref", "atntime", "atrfend", "atrfstart", "author", "background", "bkmkend",
+    "bkmkstart", "blipuid", "buptim", "category", "colorschememapping", "colortbl", "comment",
+    "company", "creatim", "datafield", "datastore", "defchp", "defpap", "do", "doccomm",
+    "docvar", "dptxbxtext", "ebcend", "ebcstart", "factoidname", "falt", "fchars", "ffdeftext",
+    "ffentrymcr", "ffexitmcr", "ffformat", "ffhelptext", "ffl", "ffname", "ffstattext", "file",
+    "filetbl", "fldinst", "fldtype", "fname", "fontemb", "fontfile", "fonttbl", "footer",
+    "footerf", "footerl", "footerr", "footnote", "formfield", "ftncn", "ftnsep", "ftnsepc", "g",
+    "generator", "gridtbl", "header", "headerf", "headerl", "headerr", "hl", "hlfr",
+    "hlinkbase", "hlloc", "hlsrc", "hsv", "htmltag", "info", "keycode", "keywords",
+    "latentstyles", "lchars", "levelnumbers", "leveltext", "lfolevel", "linkval", "list",
+    "listlevel", "listname", "listoverride", "listoverridetable", "listpicture",
+    "liststylename", "listtable", "lsdlockedexcept", "macc", "maccPr", "mailmerge", "maln",
+    "malnScr", "manager", "margPr", "mbar", "mbarPr", "mbaseJc", "mbegChr", "mborderBox",
+    "mborderBoxPr", "mbox", "mboxPr", "mchr", "mcount", "mctrlPr", "md", "mdPr", "mdeg",
+    "mdegHide", "mden", "mdiff", "me", "mendChr", "meqArr", "meqArrPr", "mf", "mfName", "mfPr",
+    "mfunc", "mfuncPr", "mgroupChr", "mgroupChrPr", "mgrow", "mhideBot", "mhideLeft",
+    "mhideRight", "mhideTop", "mhtmltag", "mlim", "mlimloc", "mlimlow", "mlimlowPr", "mlimupp",
+    "mlimuppPr", "mm", "mmPr", "mmaddfieldname", "mmath", "mmathPict", "mmathPr", "mmaxdist",
+    "mmc", "mmcJc", "mmcPr", "mmconnectstr", "mmconnectstrdata", "mmcs", "mmdatasource",
+    "mmheadersource", "mmmailsubject", "mmodso", "mmodsofilter", "mmodsofldmpdata",
+    "mmodsomappedname", "mmodsoname", "mmodsorecipdata", "mmodsosort", "mmodsosrc",
+    "mmodsotable", "mmodsoudl", "mmodsoudldata", "mmodsouniquetag", "mmquery", "mmr", "mnary",
+    "mnaryPr", "mnoBreak", "mnum", "moMath", "moMathPara", "moMathParaPr", "mobjDist", "mopEmu",
+    "mphant", "mphantPr", "mplcHide", "mpos", "mr", "mrPr", "mrad", "mradPr", "msPre",
+    "msPrePr", "msSub", "msSubPr", "msSubSup", "msSubSupPr", "msSup", "msSupPr", "msepChr",
+    "mshow", "mshp", "mstrikeBLTR", "mstrikeH", "mstrikeTLBR", "mstrikeV", "msub", "msubHide",
+    "msup", "msupHide", "mtransp", "mtype", "mvertJc", "mvfmf", "mvfml", "mvtof", "mvtol",
+    "mzeroAsc", "mzeroDesc", "mzeroWid", "nesttableprops", "nextfile", "nonesttables",
+    "objalias", "objclass", "objdata", "object", "objname", "objsect", "objtime", "oldcprops",
+    "oldpprops", "oldsprops", "oldtprops", "oleclsid", "operator", "panose", "password",
+    "passwordhash", "pgp", "pgptbl", "picprop", "pict", "pn", "pnseclvl", "pntext", "pntxta",
+    "pntxtb", "printim", "private", "propname", "protend", "protstart", "protusertbl", "pxe",
+    "result", "revtbl", "revtim", "rsidtbl", "rxe", "shp", "shpgrp", "shpinst", "shppict",
+    "shprslt", "shptxt", "sn", "sp", "staticval", "stylesheet", "subject", "sv", "svb", "tc",
+    "template", "themedata", "title", "txe", "ud", "upr", "userprops", "wgrffmtfilter",
+    "windowcaption", "writereservation", "writereservhash", "xe", "xform", "xmlattrname",
+    "xmlattrvalue", "xmlclose", "xmlname", "xmlnstbl", "xmlopen",
+))
+
+# \fcharset \u2192 Python \u7F16\u7801
+CHARSET_MAP = {
+    0: "cp1252",
+    42: "cp1252",
+    77: "mac_roman",
+    78: "mac_japanese",
+    79: "mac_chinesetrad",
+    80: "mac_korean",
+    81: "mac_arabic",
+    82: "mac_hebrew",
+    83: "mac_greek",
+    84: "mac_cyrillic",
+    85: "mac_chinesesimp",
+    86: "mac_rumanian",
+    87: "mac_ukrainian",
+    88: "mac_thai",
+    89: "mac_ce",
+    128: "cp932",
+    129: "cp949",
+    130: "cp1361",
+    134: "cp936",
+    136: "cp950",
+    161: "cp1253",
+    162: "cp1254",
+    163: "cp1258",
+    177: "cp1255",
+    178: "cp1256",
+    186: "cp1257",
+    204: "cp1251",
+    222: "cp874",
+    238: "cp1250",
+    254: "cp437",
+    255: "cp850",
+}
+
+# \u6BB5\u843D / \u5206\u8282\uFF1A\u8F93\u51FA\u6362\u884C\uFF0C\u5E76\u628A\u5F53\u524D\u5B57\u4F53\u91CD\u7F6E\u4E3A\u9ED8\u8BA4\u5B57\u4F53
+SECTIONCHARS = {"par": "\n", "sect": "\n\n", "page": "\n\n"}
+SPECIALCHARS = {
+    "line": "\n",
+    "tab": "\t",
+    "emdash": "\u2014",
+    "endash": "\u2013",
+    "emspace": "\u2003",
+    "enspace": "\u2002",
+    "qmspace": "\u2005",
+    "bullet": "\u2022",
+    "lquote": "\u2018",
+    "rquote": "\u2019",
+    "ldblquote": "\u201C",
+    "rdblquote": "\u201D",
+    "row": "\n",
+    "cell": "|",
+    "nestcell": "|",
+    "~": "\xa0",
+    "\n": "\n",
+    "\r": "\r",
+    "{": "{",
+    "}": "}",
+    "\\": "\\",
+    "-": "\xad",
+    "_": "\u2011",
+    **SECTIONCHARS,
+}
+
+RTF_TOKEN = re.compile(
+    r"\\([a-z]{1,32})(-?\d{1,10})?[ ]?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)",
+    re.IGNORECASE,
+)
+
+HYPERLINKS = re.compile(
+    r"(\{\\field\{\s*\\\*\\fldinst\{.*HYPERLINK\s(\".*\")\}{2}\s*\{.*?\s+(.*?)\}{2,3})",
+    re.IGNORECASE,
+)
+
+FONTTABLE = re.compile(r"\\f(\d+).*?\\fcharset(\d+).*?([^;]+);")
@@ -2,6 +2,24 @@
 
 KEYWORD_ROOTS = []
 USE_SEMANTIC_FILTER = False
-SENTENCE_RECORDS = []
+SEMANTIC_BATCH_SIZE = 1024  # 语义过滤时跨文件攒批编码的句子数
+SENTENCE_STREAM = iter(())  # Step-1 产出的句子记录批次（惰性）
+RECORD_CHUNK_SIZE = 5000
+NER_BATCH_SIZE = 256  # Step-2 nlp.pipe 的 batch_size
+NER_PROCESSES = 1     # Step-2 nlp.pipe 的 n_process（-1 = CPU 核数）
+NER_PREFILTER = False  # Step-2 跳过规则估计不足 2 个公司的句子，不做 NER（近似，可能漏掉名称）
+USE_NER_CACHE = True  # 句子 → NER 结果的磁盘缓存（<CACHE_DIR>/ner）
 
 EXTRACT_MODE = "LEXIS"
+EXTRACT_WORKERS = 1
+INPUT_ARCHIVE = ""  # 非空时 Step-1 直接读取该 zip 内的文件
+USE_EXTRACT_CACHE = True
+DEDUP_ARTICLES = False  # Step-1 跳过跨文件的近重复（转载）文章（会减少 result.csv 的行，默认关闭）
+DEDUP_THRESHOLD = 0.8   # MinHash 估计的 Jaccard 相似度阈值
+
+USE_EMBED_CACHE = True  # 句向量磁盘缓存（<CACHE_DIR>/embeddings）
+EMBED_CACHE_MAX_MB = 512
+EMB_BACKEND = "torch"  # 句向量后端：torch（fp32）；int8 / onnx 只供 benchmarks/bench_emb_backend.py 对比，
+                       # 用真实模型确认阈值一致率之前不作为运行选项
+NN_BACKEND = "exact"  # canonical 向量最近邻：exact（精确）/ ivf（近似）
+NN_NPROBE = 8         # ivf 每次查询扫描的簇数
@@ -1,43 +1,66 @@
 # coding: utf-8
+import hashlib
+import itertools
+import os
 import re
-from typing import List, Dict, Set
+import sqlite3
+import tempfile
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Iterator, List, Dict, Optional, Set, Tuple, Union
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from tqdm import tqdm
-import numpy as np
-from rapidfuzz import fuzz, process
 
 from .env_bootstrap import cute_box
-from .constants import BASE_DIR, MAX_COMP_COLS
+from .constants import BASE_DIR, MAX_COMP_COLS, ORG_SUFFIX
 from . import state
-from .model_utils import nlp, model_emb, calc_Bad_Score
+from .company_dedup import ContainmentDeduper, write_row_names
+from .fuzzy_match import FuzzyMatcher
+from .lexicon import CompanyLexicon
+from .ner_cache import NerCache
+from .model_utils import (get_nlp, calc_Bad_Score_batch, encode_texts, embed_cache_stats,
+                          ner_model_version, emb_model_key)
+from .nn_index import NNIndex, open_canon_index, save_canon_index, sync_canon_index
 from .text_utils import is_valid_token
 
 def dedup_company_cols(df: pd.DataFrame) -> pd.DataFrame:
     comp_cols = [c for c in df.columns if c.startswith("company_")]
-    for ridx in df.index:
+    if not comp_cols:
+        return df
+    values = df[comp_cols].to_numpy(dtype=object, copy=True)
+    for r in values:
         seen: Set[str] = set()
-        for col in comp_cols:
-            val = str(df.at[ridx, col]).strip()
+        for i, val in enumerate(r):
+            val = str(val).strip()
             if val in seen:
-                df.at[ridx, col] = ""
+                r[i] = ""
             else:
                 seen.add(val)
+    for i, col in enumerate(comp_cols):
+        df[col] = values[:, i]
     return df
 
-def extract_companies(text: str,
-                      company_db: List[str],
-                      ner_model,
-                      fuzzy_threshold: int = 95) -> List[str]:
-    comps: Set[str] = set()
-
+def _clean_ner_text(text: str) -> str:
+    """送入 NER 之前的清洗（去日期尾巴、商标符号、括号缩写、邮箱）。"""
     text_clean = re.sub(r"\s*\d{1,2}/\d{1,2}/\d{2,4}.*$", "", text).strip()
     text_clean = re.sub(r"[®™©]", "", text_clean)
     text_clean = re.sub(r"\(\s*[A-Z]{1,3}\s*\)", "", text_clean)
     text_clean = re.sub(r"\b\S+@\S+\b", "", text_clean)
+    return text_clean
+
+_ENT_STOPWORDS = {"The","And","For","With","From","That","This"}
+_ERS = re.compile(r"\b([A-Z]{2,})ers\b")
+_ALPHA_RUN = re.compile(r"[^\W\d_]+")
+
+# 改动 _ner_names 的过滤规则时加一，使 NER 缓存作废
+NER_RULE_VERSION = 1
+
+def _ner_names(doc) -> List[str]:
+    """与词典无关的部分：NER 实体过滤 + "XXers" 规则（按加入顺序去重）。可跨运行缓存。"""
+    names: List[str] = []
 
-    doc = ner_model(text_clean)
     for ent in doc.ents:
         ent_text = ent.text.strip()
 
@@ -46,19 +69,24 @@ def extract_companies(text: str,
         valid_ent = True
         for w in ent_text.split():
             if (not w[0].isalpha()
-                or w in {"The","And","For","With","From","That","This"}
+                or w in _ENT_STOPWORDS
                 or not is_valid_token(w)):
                 valid_ent = False
                 break
-        if valid_ent:
-            comps.add(ent_text)
+        if valid_ent and ent_text not in names:
+            names.append(ent_text)
 
-    for m in re.findall(r"\b([A-Z]{2,})ers\b", text_clean):
-        comps.add(m)
+    for m in _ERS.findall(doc.text):
+        if m not in names:
+            names.append(m)
+    return names
 
+def _lexicon_tokens(text_clean: str, lexicon: CompanyLexicon) -> List[str]:
+    """大写词规则：句中（非句首）在词典里的单个大写词。"""
     STOPWORDS = {"The","And","For","With","From","That","This","Have","Will",
                 "Are","You","Not","But","All","Any","One","Our","Their"}
 
+    found = []
     tokens = re.findall(r"\b\S+\b", text_clean)
     for pos, token in enumerate(tokens):
         if (pos == 0 or token in STOPWORDS
@@ -68,95 +96,225 @@ def extract_companies(text: str,
             or not is_valid_token(token)):
             continue
 
-        if any(token.lower() == db.lower() for db in company_db):
-            comps.add(token)
+        if token in lexicon:
+            found.append(token)
+    return found
 
-    return list(comps)
+def _companies_from_names(ner_names: List[str], text_clean: str, lexicon: CompanyLexicon) -> List[str]:
+    """在 _ner_names 的结果上补充大写词规则与词典里的多词公司名。"""
+    comps: Set[str] = set(ner_names)
+    comps.update(_lexicon_tokens(text_clean, lexicon))
 
-def step2(mysql_url: str):
-    cute_box(
-        "Step-2：公司识别＋BAN 过滤 中…",
-        "Step-2：企業名認識＋BAN フィルタ中…",
-        "🏷️"
-    )
-    engine_tmp = create_engine(mysql_url)
-    df_canon = pd.read_sql("SELECT id, canonical_name FROM company_canonical", engine_tmp)
-    df_canon.to_csv(BASE_DIR / "canonical_list.csv", index=False, encoding="utf-8-sig")
-    cute_box(
-        f"已写出 canonical_list.csv，共 {len(df_canon)} 行",
-        f"canonical_list.csv を保存しました：{len(df_canon)} 行",
-        "🗂️"
-    )
+    for name in lexicon.find_phrases(text_clean):
+        comps.add(name)
 
-    engine = create_engine(mysql_url)
-    with engine.begin() as conn:
-        ban_set = {r[0] for r in conn.execute(text("SELECT alias FROM ban_list"))}
-        rows = conn.execute(text("""
-            SELECT a.alias, c.canonical_name FROM company_alias a
-            JOIN company_canonical c ON a.canonical_id = c.id
-        """))
-        alias_map = {alias: canon for alias, canon in rows}
-        canon_set = {r[0] for r in conn.execute(text("SELECT canonical_name FROM company_canonical"))}
-        canon_names = list(canon_set)
-        canon_vecs  = model_emb.encode(canon_names, batch_size=64, normalize_embeddings=True)
-        rows2 = conn.execute(text(
-            "SELECT id, canonical_name FROM company_canonical"
-        ))
-        canon_name2id = {name: cid for cid, name in rows2}
-    
-    cute_box(
-    f"ban_list={len(ban_set)}，alias_map={len(alias_map)}，canon_set={len(canon_set)}",
-    f"ban_list：{len(ban_set)}件／alias_map：{len(alias_map)}件／canon_set：{len(canon_set)}件",
-    "🔍"
-    )
+    return list(comps)
 
-    df = pd.DataFrame(state.SENTENCE_RECORDS)
-    if df.empty or "Hit_Count" not in df.columns:
-        cute_box(
-            "Step-1 没提取到任何句子，请确认输入文件或抽取模式。",
-            "Step-1 で文が取得できませんでした。入力ファイルや抽出モードを確認してください。",
-            "🚫"
-        )
-        return
+def _companies_from_doc(doc, lexicon: CompanyLexicon) -> List[str]:
+    """在 NER 结果上做实体过滤，再补充大写词规则与词典里的多词公司名；doc.text 即清洗后的句子。"""
+    return _companies_from_names(_ner_names(doc), doc.text, lexicon)
 
-    df_hit = df[df["Hit_Count"].astype(int) >= 1].reset_index(drop=True)
-    df_hit = df[df["Hit_Count"].astype(int) >= 1].reset_index(drop=True)
-    if df_hit.empty:
-        cute_box(
-        "Step-1 没提取到任何句子，请先跑 Step-1！",
-        "Step-1 で文が取得できませんでした。まず Step-1 を実行してね",
-        "🚫"
-        )
+def ner_cache_namespace() -> str:
+    """NER 缓存的命名空间：spaCy 版本、模型名/版本、规则版本任一变化都使缓存作废。"""
+    return f"{ner_model_version()};rules={NER_RULE_VERSION}"
+
+def extract_companies(text: str,
+                      company_db: Union[CompanyLexicon, List[str]],
+                      ner_model,
+                      fuzzy_threshold: int = 95) -> List[str]:
+    if not isinstance(company_db, CompanyLexicon):
+        company_db = CompanyLexicon.from_names(company_db)
+    return _companies_from_doc(ner_model(_clean_ner_text(text)), company_db)
+
+def _max_companies(text_clean: str, lexicon: CompanyLexicon) -> int:
+    """
+    _companies_from_doc 在这句话上大致能给出几个名称的估计（只需判断是否 ≥ 2，够 2 即返回）：
+      - 实体：每个含大写字母、且不在 _ENT_STOPWORDS 中的字母串计一个；
+        全小写的只计 ORG_SUFFIX 词（"acme inc" 这类写法）；
+      - "XXers" 规则、大写词规则：每处匹配另计一个；
+      - 词典多词名称：find_phrases 的结果本身。
+    这不是严格上界：spaCy 也会把全小写的词识别成实体（"today"、"two"），
+    这类实体会被 _ner_names 接受，而这里不计。
+    """
+    n = 0
+    for w in _ALPHA_RUN.findall(text_clean):
+        if w not in _ENT_STOPWORDS and (not w.islower() or ORG_SUFFIX.fullmatch(w)):
+            n += 1
+            if n >= 2:
+                return n
+    n += len(_ERS.findall(text_clean)) + len(_lexicon_tokens(text_clean, lexicon))
+    if n >= 2:
+        return n
+    return n + len(lexicon.find_phrases(text_clean))
+
+def _open_ner_cache() -> Optional[NerCache]:
+    if not state.USE_NER_CACHE:
+        return None
+    try:
+        return NerCache(ner_cache_namespace())
+    except Exception as e:
+        print(f"⚠️ NER 缓存不可用，本次不使用缓存（不影响结果）: {e}")
+        return None
+
+def _hit_frames(stream, counter: Dict[str, int]) -> Iterator[pd.DataFrame]:
+    """Step-1 的记录批次 → 命中句 DataFrame（跳过没有命中的批次），顺带统计记录总数。"""
+    for chunk in stream:
+        df = pd.DataFrame(chunk)
+        counter["records"] += len(df)
+        if df.empty or "Hit_Count" not in df.columns:
+            continue
+        df_hit = df[df["Hit_Count"].astype(int) >= 1].reset_index(drop=True)
+        if df_hit.empty:
+            continue
+        yield df_hit
+
+def sentence_key(text_clean: str) -> bytes:
+    """清洗后句子的去重键（16 字节摘要，全语料的键常驻内存）。"""
+    return hashlib.blake2b(text_clean.encode("utf-8"), digest_size=16).digest()
+
+_FLUSH = object()      # _texts 产出的释放标记：让外层循环拿回控制权，产出已就绪的批次
+_FLUSH_EVERY = 16      # 每有这么多句不需要 NER（缓存 / 重复 / 预筛），插入一个标记
+_DONE_MAX = 200_000    # 进程内句子结果表（LRU）的上限；被淘汰的句子再出现时走 NER 缓存或重新识别
+
+def _iter_ner_chunks(frames: Iterator[pd.DataFrame],
+                     lexicon: CompanyLexicon,
+                     pbar,
+                     ner_stats: Dict[str, float],
+                     ner_cache: Optional[NerCache] = None) -> Iterator[Tuple[pd.DataFrame, List[List[str]]]]:
+    """
+    把所有批次的句子串成一条流交给 nlp.pipe（n_process>1 时子进程只启动一次），
+    按原批次重新组装，产出 (df_hit, 每句识别出的公司名列表)。
+      - 全语料去重：清洗后完全相同的句子只做一次 NER，结果分发给所有出现位置
+        （结果表按 LRU 保留最近 _DONE_MAX 个句子）；
+      - ner_cache 中已有的句子（以前的运行处理过）直接取缓存的 _ner_names，只重算词典规则；
+      - NER_PREFILTER 开启时（默认关闭），规则估计（_max_companies）不足 2 个名称的句子不送入 spaCy，
+        只保留不依赖 NER 的名称（大写词规则、"XXers"、词典多词名称）。
+        这是近似：NER 本来能识别出的名称会丢失，result.csv 与统计都可能与关闭时不同。
+    不需要 NER 的句子会在流里插入 _FLUSH 标记（空串，几乎不耗时），保证已就绪的批次及时产出，
+    内存里暂存的批次只与 pipe 的批大小有关，与语料规模无关（全部命中缓存时也一样）。
+    ner_stats 累计 sentences / duplicates / cached / skipped / ner_seconds / prefilter_seconds。
+    """
+    pending = deque()   # 结果还没收齐的批次：[df_hit, names, 已收到数]
+    done: "OrderedDict[bytes, List[str]]" = OrderedDict()  # 已有结果的句子（LRU）
+    waiting: Dict[bytes, List[Tuple[list, int]]] = {}  # 已送入 pipe、等结果的句子 → 各出现位置
+    sent_keys = deque()  # 送入 pipe 的顺序，与 docs 一一对应；_FLUSH 标记对应 None
+    feed = {"seconds": 0.0}  # 在 _texts 里花的时间（含上游 Step-1 流），不计入 NER 耗时
+
+    def _remember(key: bytes, names: List[str]) -> List[str]:
+        done[key] = names
+        if len(done) > _DONE_MAX:
+            done.popitem(last=False)
+        return names
+
+    def _texts():
+        t = time.perf_counter()
+        for df_hit in frames:
+            texts = [_clean_ner_text(sent) for sent in df_hit["Sentence"].tolist()]
+            keys = [sentence_key(txt) for txt in texts]
+            entry = [df_hit, [[] for _ in texts], 0]
+            pending.append(entry)
+            cached = {}
+            if ner_cache is not None:
+                cached = ner_cache.get_many({k for k in keys if k not in done and k not in waiting})
+            to_ner = []
+            for i, (txt, key) in enumerate(zip(texts, keys)):
+                if key not in done and key in cached:
+                    entry[1][i] = _remember(key, _companies_from_names(cached[key], txt, lexicon))
+                    entry[2] += 1
+                    ner_stats["cached"] += 1
+                elif key in done:
+                    done.move_to_end(key)
+                    entry[1][i] = done[key]
+                    entry[2] += 1
+                    ner_stats["duplicates"] += 1
+                elif key in waiting:
+                    waiting[key].append((entry, i))
+                    ner_stats["duplicates"] += 1
+                elif state.NER_PREFILTER and not _prefilter_keep(txt):
+                    rule_names = list(dict.fromkeys(_ERS.findall(txt)))
+                    entry[1][i] = _remember(key, _companies_from_names(rule_names, txt, lexicon))
+                    entry[2] += 1
+                    ner_stats["skipped"] += 1
+                else:
+                    waiting[key] = [(entry, i)]
+                    to_ner.append((key, txt))
+            ner_stats["sentences"] += len(texts)
+            n_resolved = len(texts) - len(to_ner)
+            pbar.update(n_resolved)
+            n_flush = -(-n_resolved // _FLUSH_EVERY)
+            for key, txt in to_ner + [(None, _FLUSH)] * n_flush:
+                sent_keys.append(key)
+                feed["seconds"] += time.perf_counter() - t
+                yield txt
+                t = time.perf_counter()
+        feed["seconds"] += time.perf_counter() - t
+
+    def _prefilter_keep(txt: str) -> bool:
+        t0 = time.perf_counter()
+        keep = _max_companies(txt, lexicon) >= 2
+        ner_stats["prefilter_seconds"] += time.perf_counter() - t0
+        return keep
+
+    def _ready():
+        while pending and pending[0][2] == len(pending[0][1]):
+            df_hit, names, _ = pending.popleft()
+            yield df_hit, names
+
+    docs = _ner_pipe(_texts())
+    while True:
+        t0 = time.perf_counter()
+        feed0 = feed["seconds"]
+        doc = next(docs, _FLUSH)
+        if doc is _FLUSH:
+            break
+        key = sent_keys.popleft()
+        if key is not None:
+            ner_names = _ner_names(doc)
+            if ner_cache is not None:
+                ner_cache.put(key, ner_names)
+            names = _remember(key, _companies_from_names(ner_names, doc.text, lexicon))
+            for entry, i in waiting.pop(key):
+                entry[1][i] = names
+                entry[2] += 1
+            ner_stats["ner_seconds"] += time.perf_counter() - t0 - (feed["seconds"] - feed0)
+            pbar.update(1)
+        yield from _ready()
+    yield from _ready()
+
+def _ner_pipe(texts: Iterator) -> Iterator:
+    """
+    nlp.pipe 的惰性包装：第一句真正需要 NER 的句子出现时才加载 spaCy 模型（全部命中缓存时不加载）。
+    在此之前的 _FLUSH 标记直接产出 None；之后标记以空串送入 pipe，与普通句子保持顺序。
+    """
+    for first in texts:
+        if first is _FLUSH:
+            yield None
+            continue
+        rest = ("" if txt is _FLUSH else txt for txt in texts)
+        yield from get_nlp().pipe(itertools.chain([first], rest),
+                                  batch_size=max(1, state.NER_BATCH_SIZE),
+                                  n_process=state.NER_PROCESSES)
         return
 
-    company_db = list(canon_set) + list(alias_map.keys())
-    comp_cols: List[List[str]] = []
-    for sent in tqdm(df_hit["Sentence"].tolist(), desc="公司识别"):
-        names_raw = extract_companies(sent, company_db, nlp)
+def _companies_for_chunk(df_hit: pd.DataFrame,
+                         names_per_sent: List[List[str]],
+                         ban_lower: Set[str],
+                         canon_lower: Set[str],
+                         alias_lower: Dict[str, str],
+                         canon_lower2orig: Dict[str, str]) -> pd.DataFrame:
+    rows: List[List[str]] = []
+    for names_raw in names_per_sent:
         uniq: List[str] = []
         for alias in names_raw:
-            if alias in uniq:     
+            if alias in uniq:
                 continue
             uniq.append(alias)
-        comp_cols.append(uniq[:MAX_COMP_COLS])
 
-    for i in range(MAX_COMP_COLS):
-        df_hit[f"company_{i+1}"] = [lst[i] if i < len(lst) else "" for lst in comp_cols]
-        
-    ban_lower     = {b.lower() for b in ban_set}
-    canon_lower   = {c.lower() for c in canon_set}
-    alias_lower   = {a.lower(): canon for a, canon in alias_map.items()}
-    canon_lower2orig = {c.lower(): c for c in canon_set}
-
-    def _norm_key(s: str) -> str:
-        return re.sub(r"[^A-Za-z0-9]", "", s).lower()
-
-    comp_cols = [f"company_{i+1}" for i in range(MAX_COMP_COLS)]
-
-    for ridx in df_hit.index:
-        orig_names = [df_hit.at[ridx, c].strip() for c in comp_cols if df_hit.at[ridx, c].strip()]
-        new_names  = []
-        for nm in orig_names:
+        new_names = []
+        for nm in uniq[:MAX_COMP_COLS]:
+            nm = nm.strip()
+            if not nm:
+                continue
             nm_l = nm.lower()
             if nm_l in ban_lower:
                 continue
@@ -167,17 +325,10 @@ def step2(mysql_url: str):
                 new_names.append(alias_lower[nm_l])
                 continue
             new_names.append(nm)
+        rows.append(new_names)
 
-        cleaned = []
-        seen_keys = set()
-        for nm in sorted(new_names, key=len, reverse=True):
-            key = _norm_key(nm)
-            if any(key in k or k in key for k in seen_keys):
-                continue
-            cleaned.append(nm)
-            seen_keys.add(key)
-        for i, col in enumerate(comp_cols):
-            df_hit.at[ridx, col] = cleaned[i] if i < len(cleaned) else ""
+    comp_cols = [f"company_{i+1}" for i in range(MAX_COMP_COLS)]
+    write_row_names(df_hit, comp_cols, ContainmentDeduper().dedup_rows(rows))
 
     meta_cols = ["Tier_1", "Tier_2", "Filename", "Date",
                  "Title", "Publisher", "Sentence",
@@ -186,22 +337,59 @@ def step2(mysql_url: str):
     df_final = (df_hit[meta_cols +
                 [c for c in df_hit.columns if c.startswith("company_")]]
                 .fillna(""))
-    df_final = dedup_company_cols(df_final)
-
-    df_final.to_csv(BASE_DIR / "result.csv",
-                    index=False, encoding="utf-8-sig")
-    cute_box(
-        f"已生成 result.csv，共 {len(df_final)} 条记录",
-        f"result.csv を生成しました：全{len(df_final)}件",
-        "📑"
-    )
-
-    canon_name2id = {row.canonical_name: row.id for row in df_canon.itertuples()}
-
-    todo_rows: List[Dict] = []
-    ban_hits = alias_hits = canon_hits = 0
-    rows_skipped_not_enough_companies = 0
-
+    return dedup_company_cols(df_final)
+
+def _add_occurrence_counts(res_path, chunk_size: int = 50000) -> int:
+    """
+    给 result.csv 加上 Occurrences 列（该句清洗后在全语料中的出现次数），放在 Matched_Keywords 之后。
+    每个命中句在 result.csv 里都有一行，次数即同一 sentence_key 的行数：
+    第一遍按块计数（计数表放在临时 sqlite 里，内存不随语料增长），第二遍写回。
+    返回不同句子的个数。
+    """
+    tmp_path = res_path.with_name(res_path.name + ".tmp")
+
+    def _chunks():
+        return pd.read_csv(res_path, dtype=str, keep_default_na=False,
+                           encoding="utf-8-sig", chunksize=chunk_size)
+
+    with tempfile.TemporaryDirectory(dir=res_path.parent) as tmp_dir:
+        db = sqlite3.connect(os.path.join(tmp_dir, "occurrences.sqlite"))
+        try:
+            db.execute("CREATE TABLE counts (key BLOB PRIMARY KEY, n INTEGER)")
+            for df in _chunks():
+                part = Counter(sentence_key(_clean_ner_text(sent)) for sent in df["Sentence"])
+                db.executemany("INSERT INTO counts VALUES (?, ?) "
+                               "ON CONFLICT(key) DO UPDATE SET n = n + excluded.n", part.items())
+            db.commit()
+            n_unique = db.execute("SELECT COUNT(*) FROM counts").fetchone()[0]
+
+            with open(tmp_path, "w", encoding="utf-8-sig", newline="") as out:
+                for n, df in enumerate(_chunks()):
+                    keys = [sentence_key(_clean_ner_text(sent)) for sent in df["Sentence"]]
+                    found: Dict[bytes, int] = {}
+                    uniq = list(set(keys))
+                    for i in range(0, len(uniq), 500):
+                        part = uniq[i:i + 500]
+                        found.update((bytes(k), c) for k, c in db.execute(
+                            f"SELECT key, n FROM counts WHERE key IN ({','.join('?' * len(part))})", part))
+                    df.insert(df.columns.get_loc("Matched_Keywords") + 1, "Occurrences",
+                              [found.get(k, 1) for k in keys])
+                    df.to_csv(out, index=False, header=(n == 0))
+        finally:
+            db.close()
+    os.replace(tmp_path, res_path)
+    return n_unique
+
+def _collect_unknowns(df_final: pd.DataFrame,
+                      ban_lower: Set[str],
+                      alias_lower: Dict[str, str],
+                      canon_lower: Set[str],
+                      unknown_first: Dict[str, Tuple[str, str]],
+                      stats: Dict[str, int]) -> None:
+    """
+    统计 ban / alias / canonical 命中，并收集未知别名。
+    别名按小写去重，只保留首次出现时的写法和句子（与 todo 表 drop_duplicates 的结果一致）。
+    """
     comp_cols = [c for c in df_final.columns if c.startswith("company_")]
 
     for _, row in df_final.iterrows():
@@ -211,63 +399,248 @@ def step2(mysql_url: str):
         for alias in names:
             alias_l = alias.lower()
             if alias_l in ban_lower:
-                ban_hits += 1
+                stats["ban_hits"] += 1
                 continue
             if alias_l in alias_lower:
-                alias_hits += 1
+                stats["alias_hits"] += 1
                 continue
             if alias_l in canon_lower:
-                canon_hits += 1
+                stats["canon_hits"] += 1
                 continue
             unknowns.append(alias)
 
         if len(names) < 2:
-            rows_skipped_not_enough_companies += 1
+            stats["rows_skipped_not_enough_companies"] += 1
             continue
 
-        if len(canon_vecs) > 0 and unknowns:
-            unknown_vecs = model_emb.encode(unknowns, normalize_embeddings=True)
-        else:
-            unknown_vecs = []
-
-        for i, alias in enumerate(unknowns):
-            advice = ""
-            adviced_id = ""
-            match_info = ""
-            
-            fuzzy_res = process.extractOne(alias, canon_names, scorer=fuzz.token_sort_ratio)
-            
-            if fuzzy_res:
-                candidate, score, _ = fuzzy_res
-                if score >= 90:
-                    advice = candidate
-                    adviced_id = canon_name2id.get(advice, "")
-                    match_info = f"Fuzzy({score:.0f})"
-            
-            if not advice and len(canon_vecs) > 0:
-                curr_vec = unknown_vecs[i]
-                sims = np.dot(canon_vecs, curr_vec)
-                best_idx = int(np.argmax(sims))
-                vector_score = float(sims[best_idx])
-                
+        for alias in unknowns:
+            unknown_first.setdefault(alias.lower(), (alias, row["Sentence"]))
+
+_ENCODE_BLOCK = 8192
+
+def _todo_rows_from_unknowns(unknown_first: Dict[str, Tuple[str, str]],
+                             canon_names: List[str],
+                             canon_name2id: Dict[str, int],
+                             canon_index: NNIndex,
+                             lexicon: CompanyLexicon) -> List[Dict]:
+    """
+    对去重后的未知别名统一给出建议：
+      1) 归一化键（去后缀/标点、casefold）与已有 canonical/alias 完全一致的，作为建议写入 Advice
+         （Canonical_Name 留空，与 fuzzy / 向量建议一样需要人工或 AI 确认）；
+      2) 其余先 fuzzy，未命中的再批量编码、在 canonical 索引里找最近邻。
+    """
+    aliases = [alias for alias, _ in unknown_first.values()]
+    sentences = [sent for _, sent in unknown_first.values()]
+    advice = [""] * len(aliases)
+    adviced_id = [""] * len(aliases)
+    match_info = [""] * len(aliases)
+
+    for i, alias in enumerate(aliases):
+        cid = lexicon.resolve_normalized(alias)
+        if cid is not None:
+            advice[i] = lexicon.canon_id2name[cid]
+            adviced_id[i] = cid
+            match_info[i] = "Match(normalized)"
+
+    need_fuzzy = [i for i in range(len(aliases)) if not advice[i]]
+    # 建三元组索引要遍历全部 canonical，没有需要 fuzzy 的别名时不建
+    fuzzy_hits = (FuzzyMatcher(canon_names, threshold=90).match([aliases[i] for i in need_fuzzy])
+                  if need_fuzzy else [])
+    for i, fuzzy_res in zip(need_fuzzy, fuzzy_hits):
+        if fuzzy_res:
+            candidate, score = fuzzy_res
+            advice[i] = candidate
+            adviced_id[i] = canon_name2id.get(candidate, "")
+            match_info[i] = f"Fuzzy({score:.0f})"
+
+    if len(canon_index) > 0:
+        need_vec = [i for i in range(len(aliases)) if not advice[i]]
+        for b in range(0, len(need_vec), _ENCODE_BLOCK):
+            block = need_vec[b:b + _ENCODE_BLOCK]
+            vecs = encode_texts([aliases[i] for i in block])
+            best_id, best_sim = canon_index.search(vecs)
+            for i, cid, vector_score in zip(block, best_id.tolist(), best_sim.tolist()):
                 if vector_score >= 0.82:
-                    advice = canon_names[best_idx]
-                    adviced_id = canon_name2id.get(advice, "")
-                    match_info = f"AI({vector_score:.2f})"
-
-            todo_rows.append({
-                "Sentence": row["Sentence"],
-                "Alias":    alias,
-                "Bad_Score": calc_Bad_Score(alias),
-                "Advice":   advice,
-                "Adviced_ID": adviced_id,
-                "Canonical_Name": "",
-                "Std_Result": ""
-            })
+                    advice[i] = lexicon.canon_id2name[cid]
+                    adviced_id[i] = cid
+                    match_info[i] = f"AI({vector_score:.2f})"
+
+    bad_scores = calc_Bad_Score_batch(aliases)
+    return [{
+        "Sentence": sentences[i],
+        "Alias":    aliases[i],
+        "Bad_Score": bad_scores[i],
+        "Advice":   advice[i],
+        "Adviced_ID": adviced_id[i],
+        "Match_Info": match_info[i],
+        "Canonical_Name": "",
+        "Std_Result": ""
+    } for i in range(len(aliases))]
+
+def _load_canon_index(canon_id2name: Dict[int, str]) -> NNIndex:
+    """
+    读取磁盘上的 canonical 向量索引（<CACHE_DIR>/canon_index），只编码上次同步之后
+    新增或改名的 canonical，同步后存回；启动耗时与新增行数成正比，而不是总行数。
+    索引只是缓存：读写失败都不影响结果。
+    """
+    index, names = open_canon_index(emb_model_key(), state.NN_BACKEND, state.NN_NPROBE)
+    index, n_added, n_removed = sync_canon_index(
+        index, names, canon_id2name,
+        lambda batch: encode_texts(batch, batch_size=64),
+        state.NN_BACKEND, state.NN_NPROBE,
+    )
+    if n_added or n_removed:
+        try:
+            save_canon_index(index, emb_model_key(), names)
+        except OSError as e:
+            print(f"⚠️ canonical 索引写盘失败（不影响结果）: {e}")
+    cute_box(
+        f"canonical 索引（{index.backend}）：共 {len(index)} 条，新编码 {n_added} 条，删除 {n_removed} 条",
+        f"canonical インデックス（{index.backend}）：全 {len(index)} 件／新規エンコード {n_added} 件／削除 {n_removed} 件",
+        "🧭"
+    )
+    return index
+
+def step2(mysql_url: str):
+    cute_box(
+        "Step-2：公司识别＋BAN 过滤 中…",
+        "Step-2：企業名認識＋BAN フィルタ中…",
+        "🏷️"
+    )
+    engine_tmp = create_engine(mysql_url)
+    df_canon = pd.read_sql("SELECT id, canonical_name FROM company_canonical", engine_tmp)
+    df_canon.to_csv(BASE_DIR / "canonical_list.csv", index=False, encoding="utf-8-sig")
+    cute_box(
+        f"已写出 canonical_list.csv，共 {len(df_canon)} 行",
+        f"canonical_list.csv を保存しました：{len(df_canon)} 行",
+        "🗂️"
+    )
+
+    engine = create_engine(mysql_url)
+    with engine.begin() as conn:
+        lexicon = CompanyLexicon.from_db(conn)
+    ban_set   = lexicon.ban_set
+    alias_map = lexicon.alias_map
+    canon_set = lexicon.canon_set
+    canon_names = list(canon_set)
+    canon_index = _load_canon_index(lexicon.canon_id2name)
+
+    cute_box(
+    f"ban_list={len(ban_set)}，alias_map={len(alias_map)}，canon_set={len(canon_set)}",
+    f"ban_list：{len(ban_set)}件／alias_map：{len(alias_map)}件／canon_set：{len(canon_set)}件",
+    "🔍"
+    )
+
+    ban_lower     = lexicon.ban_lower
+    canon_lower   = set(lexicon.canon_lower2orig)
+    alias_lower   = lexicon.alias_lower
+    canon_lower2orig = lexicon.canon_lower2orig
+
+    canon_name2id = {row.canonical_name: row.id for row in df_canon.itertuples()}
+
+    unknown_first: Dict[str, Tuple[str, str]] = {}
+    stats = {"ban_hits": 0, "alias_hits": 0, "canon_hits": 0, "rows_skipped_not_enough_companies": 0}
+
+    res_path = BASE_DIR / "result.csv"
+    res_fh = None
+    n_result = 0
+    counter = {"records": 0}
+    ner_stats = {"sentences": 0, "duplicates": 0, "cached": 0, "skipped": 0,
+                 "ner_seconds": 0.0, "prefilter_seconds": 0.0}
+    n_unique = 0
+    ner_cache = _open_ner_cache()
+    pbar = tqdm(desc="公司识别")
+    try:
+        for df_hit, names_per_sent in _iter_ner_chunks(_hit_frames(state.SENTENCE_STREAM, counter),
+                                                       lexicon, pbar, ner_stats, ner_cache):
+            df_final = _companies_for_chunk(df_hit, names_per_sent, ban_lower, canon_lower,
+                                            alias_lower, canon_lower2orig)
+
+            # result.csv 按批追加；直到出现第一批结果才覆盖旧文件
+            if res_fh is None:
+                res_fh = open(res_path, "w", encoding="utf-8-sig", newline="")
+                df_final.to_csv(res_fh, index=False)
+            else:
+                df_final.to_csv(res_fh, index=False, header=False)
+            n_result += len(df_final)
+
+            _collect_unknowns(df_final, ban_lower, alias_lower, canon_lower, unknown_first, stats)
+    finally:
+        pbar.close()
+        if res_fh is not None:
+            res_fh.close()
+        if ner_cache is not None:
+            ner_cache.close()
+    if res_fh is not None:
+        n_unique = _add_occurrence_counts(res_path)
+    n_records = counter["records"]
+
+    if n_records == 0:
+        cute_box(
+            "Step-1 没提取到任何句子，请确认输入文件或抽取模式。",
+            "Step-1 で文が取得できませんでした。入力ファイルや抽出モードを確認してください。",
+            "🚫"
+        )
+        return
+    if n_result == 0:
+        cute_box(
+        "Step-1 没提取到任何句子，请先跑 Step-1！",
+        "Step-1 で文が取得できませんでした。まず Step-1 を実行してね",
+        "🚫"
+        )
+        return
+
+    todo_rows = _todo_rows_from_unknowns(unknown_first, canon_names, canon_name2id,
+                                         canon_index, lexicon)
+
+    cute_box(
+        f"已生成 result.csv，共 {n_result} 条记录",
+        f"result.csv を生成しました：全{n_result}件",
+        "📑"
+    )
+
+    n_sent = ner_stats["sentences"]
+    if n_sent:
+        dups = ner_stats["duplicates"]
+        cute_box(
+            f"句子去重：{n_sent} 句中 {dups} 句与前文重复（{dups / n_sent:.0%}），"
+            f"只对 {n_unique} 个不同的句子做识别；result.csv 的 Occurrences 列为出现次数",
+            f"文の重複除去：{n_sent} 文のうち {dups} 文が重複（{dups / n_sent:.0%}）、"
+            f"異なる {n_unique} 文のみ認識；result.csv の Occurrences 列に出現回数を記録",
+            "🧮"
+        )
+    if state.USE_NER_CACHE and n_sent:
+        cached = ner_stats["cached"]
+        fresh = n_sent - ner_stats["duplicates"] - cached - ner_stats["skipped"]
+        cute_box(
+            f"NER 缓存：{cached} 个句子沿用以前的识别结果，新识别 {fresh} 个",
+            f"NER キャッシュ：{cached} 文は以前の認識結果を再利用、新規認識 {fresh} 文",
+            "💾"
+        )
+
+    if state.NER_PREFILTER and n_sent:
+        skipped = ner_stats["skipped"]
+        unique = n_sent - ner_stats["duplicates"] - ner_stats["cached"]
+        n_ner = unique - skipped
+        per_sent = ner_stats["ner_seconds"] / n_ner if n_ner else 0.0
+        saved = per_sent * skipped - ner_stats["prefilter_seconds"]
+        ratio = skipped / unique if unique else 0.0
+        cute_box(
+            f"NER 预筛（近似）：{skipped}/{unique} 个不同句子（{ratio:.0%}）按规则估计不足 2 个公司，未送入 spaCy，"
+            f"只保留词典/规则命中的名称；预计节省约 {saved:.1f}s（预筛耗时 {ner_stats['prefilter_seconds']:.1f}s）",
+            f"NER 事前フィルタ（近似）：異なる {unique} 文のうち {skipped} 文（{ratio:.0%}）は規則上 2 社未満と推定し spaCy をスキップ、"
+            f"辞書・規則で一致した名称のみ保持；推定 約 {saved:.1f}s 短縮（フィルタ {ner_stats['prefilter_seconds']:.1f}s）",
+            "⏩"
+        )
+
+    ban_hits = stats["ban_hits"]
+    alias_hits = stats["alias_hits"]
+    canon_hits = stats["canon_hits"]
+    rows_skipped_not_enough_companies = stats["rows_skipped_not_enough_companies"]
 
     todo_cols = [
         "Sentence", "Alias", "Bad_Score",
-        "Advice", "Adviced_ID",
+        "Advice", "Adviced_ID", "Match_Info",
         "Canonical_Name", "Std_Result"
     ]
 
@@ -305,14 +678,26 @@ def step2(mysql_url: str):
         todo_df.to_csv(BASE_DIR / "result_mapping_todo.csv",
                        index=False, encoding="utf-8-sig")
 
+        n_normalized = int((todo_df["Match_Info"] == "Match(normalized)").sum())
         cute_box(
-            f"已生成 result_mapping_todo.csv，共 {len(todo_df)} 条待处理别名。\n"
+            f"已生成 result_mapping_todo.csv，共 {len(todo_df)} 条待处理别名，"
+            f"其中 {n_normalized} 条按归一化名称找到了已有公司，已写入 Advice（Canonical_Name 需确认后填写）。\n"
             f"（ban 命中：{ban_hits}，已有 alias：{alias_hits}，已有 canonical：{canon_hits}，同行公司不足跳过：{rows_skipped_not_enough_companies}）",
-            f"result_mapping_todo.csv を作成：{len(todo_df)} 件の候補。\n"
+            f"result_mapping_todo.csv を作成：{len(todo_df)} 件の候補"
+            f"（うち {n_normalized} 件は正規化名で既存企業に一致、Advice に記入済み。Canonical_Name は確認後に入力）。\n"
             f"（ban 一致：{ban_hits}／既存エイリアス：{alias_hits}／既存カノニカル：{canon_hits}／同一行の企業数不足スキップ：{rows_skipped_not_enough_companies}）",
             "📝"
         )
         
+    cache_stats = embed_cache_stats()
+    if cache_stats is not None:
+        hits, misses = cache_stats
+        cute_box(
+            f"向量缓存：命中 {hits} 条，新编码 {misses} 条",
+            f"ベクトルキャッシュ：ヒット {hits} 件／新規エンコード {misses} 件",
+            "💾"
+        )
+
     cute_box(
     "Step-2 完成！请编辑 result_mapping_todo.csv 然后运行 Step-3",
     "Step-2 完了！result_mapping_todo.csv を編集してから Step-3 を実行してね",
@@ -1,30 +1,42 @@
 # coding: utf-8
+import csv
+import itertools
 import os
 import re
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict
+from typing import BinaryIO, Iterator, List, Dict, Optional, Set, Tuple, Union
 
-from docx import Document
 from tqdm import tqdm
 import numpy as np
 from .constants import BASE_DIR
 import pandas as pd
 
 from . import state
-from .factiva_rtf import read_rtf_text, parse_records_from_text
+from .article_dedup import LshIndex, minhash_signature
+from .factiva_rtf import iter_records
 from .options import ExtractMode
 
 from .constants import DATE_FINDER, ANCHOR_TEXT, BASE_DIR
 from .env_bootstrap import cute_box
+from .extract_cache import file_digest, cache_load, cache_store
+from .input_source import InputFile, list_input_files
+from .keyword_matcher import get_keyword_matcher
+from .lexis_docx import read_paragraph_texts
 from .text_utils import _normalize, clean_text
 from . import state
-from .model_utils import model_emb
+from .model_utils import encode_texts
 
-def extract_sentences(path: Path) -> List[str]:
-    doc = Document(path)
+PARSER_VERSION = 2  # 解析逻辑变化时 +1，使旧的抽取缓存失效
+
+def _split_fallback_sentences(paras_text: List[str]) -> List[str]:
     collecting, current, articles = False, "", []
-    for p in doc.paragraphs:
-        txt = p.text.strip()
+    for p_text in paras_text:
+        txt = p_text.strip()
         if not txt: 
             continue
         tag = txt.lower()
@@ -45,8 +57,11 @@ def extract_sentences(path: Path) -> List[str]:
                 sents.append(s)
     return sents
 
-def extract_index_titles(paragraphs):
-    paras_text = [p.text.strip() for p in paragraphs]
+def extract_sentences(path: Path) -> List[str]:
+    return _split_fallback_sentences(read_paragraph_texts(str(path)))
+
+def extract_index_titles(paras_text: List[str]):
+    paras_text = [t.strip() for t in paras_text]
     m = re.search(r'Documents?\s*\(\s*(\d+)\s*\)', '\n'.join(paras_text[:50]), re.I)
     if not m: 
         return []
@@ -82,16 +97,28 @@ def extract_index_titles(paragraphs):
                 
     return sorted(titles, key=lambda x: x[0])
 
-def _filter_sentences(raw_sents: List[str]) -> List[Dict]:
+def _anchor_vec() -> np.ndarray:
+    if not hasattr(_anchor_vec, "vec"):
+        _anchor_vec.vec = encode_texts([ANCHOR_TEXT])[0]
+    return _anchor_vec.vec
+
+def _encode_scores(sents: List[str]) -> np.ndarray:
+    """一批句子编码后与锚点向量做一次矩阵乘，返回相似度。"""
+    return encode_texts(sents) @ _anchor_vec()
+
+def _semantic_scores(sents: List[str]) -> np.ndarray:
+    bs = max(1, state.SEMANTIC_BATCH_SIZE)
+    scores = np.zeros(len(sents), dtype=np.float32)
+    for i in range(0, len(sents), bs):
+        scores[i:i + bs] = _encode_scores(sents[i:i + bs])
+    return scores
+
+def _filter_sentences(raw_sents: List[str], sim_scores=None) -> List[Dict]:
     recs: List[Dict] = []
-    if state.USE_SEMANTIC_FILTER and raw_sents:
-        if not hasattr(_filter_sentences, "anchor_vec"):
-            _filter_sentences.anchor_vec = model_emb.encode([ANCHOR_TEXT], normalize_embeddings=True)[0]
-        sent_vecs = model_emb.encode(raw_sents, normalize_embeddings=True)
-        sim_scores = np.dot(sent_vecs, _filter_sentences.anchor_vec)
-    else:
-        sim_scores = [0.0] * len(raw_sents)
+    if state.USE_SEMANTIC_FILTER and sim_scores is None:
+        sim_scores = _semantic_scores(raw_sents)
 
+    matcher = get_keyword_matcher(state.KEYWORD_ROOTS)
     for i, sent in enumerate(raw_sents):
         is_hit = False
         match_reason = ""
@@ -104,7 +131,7 @@ def _filter_sentences(raw_sents: List[str]) -> List[Dict]:
                 hit_count = 1
                 match_reason = f"Semantic({score:.2f})"
         else:
-            hits = [k for k in state.KEYWORD_ROOTS if k in sent.lower()]
+            hits = matcher.find(sent)
             if hits:
                 is_hit = True
                 hit_count = len(hits)
@@ -118,24 +145,30 @@ def _filter_sentences(raw_sents: List[str]) -> List[Dict]:
             })
     return recs
 
-def extract_sentences_by_titles(filepath: str) -> List[Dict]:
-    doc = Document(filepath); paras = doc.paragraphs
-    index_titles = extract_index_titles(paras); recs = []
+def parse_lexis_articles(source: Union[str, BinaryIO]) -> Dict:
+    """解析 Lexis docx：返回各篇文章的元数据与切分后的句子（未做关键词过滤）。"""
+    # 流式读取 word/document.xml，每段文本只拼接一次（异常文件回退到 python-docx）
+    paras = read_paragraph_texts(source)
+    index_titles = extract_index_titles(paras); articles = []
     
     if index_titles:
-        paras_norm = [_normalize(p.text) for p in paras]
+        # 规范化标题 → 升序段落位置；配合前向游标，对齐整体为线性复杂度
+        norm_pos: Dict[str, List[int]] = {}
+        for i, p_text in enumerate(paras):
+            norm_pos.setdefault(_normalize(p_text), []).append(i)
         last_article_end_idx = 0
 
         for i_title, (doc_idx, title_raw, title_norm) in enumerate(index_titles):
             match_idx = -1
             date_line_idx = -1
             
-            candidates = [i for i, n in enumerate(paras_norm) 
-                          if i >= last_article_end_idx and n == title_norm]
+            positions = norm_pos.get(title_norm, [])
+            start = bisect_left(positions, last_article_end_idx)
             
-            for idx in candidates:
+            for j in range(start, len(positions)):
+                idx = positions[j]
                 if idx + 1 < len(paras):
-                    next_line = paras[idx+1].text.strip().lower()
+                    next_line = paras[idx+1].strip().lower()
                     if next_line.startswith("client/matter") or next_line.startswith("search terms"):
                         continue 
 
@@ -143,7 +176,7 @@ def extract_sentences_by_titles(filepath: str) -> List[Dict]:
                 temp_date_idx = -1
                 for offset in range(1, 4):
                     if idx + offset >= len(paras): break
-                    txt = paras[idx + offset].text.strip()
+                    txt = paras[idx + offset].strip()
                     if DATE_FINDER.search(txt):
                         found_date = True
                         temp_date_idx = idx + offset
@@ -158,158 +191,446 @@ def extract_sentences_by_titles(filepath: str) -> List[Dict]:
                 continue
 
             if date_line_idx > match_idx + 1:
-                publisher = paras[match_idx + 1].text.strip()
+                publisher = paras[match_idx + 1].strip()
             else:
                 publisher = ""
             
             news_date = ""
-            m = DATE_FINDER.search(paras[date_line_idx].text.strip())
+            m = DATE_FINDER.search(paras[date_line_idx].strip())
             if m: 
                 news_date = m.group(0)
 
             pub_idx = date_line_idx 
             search_end_limit = len(paras)
             if i_title + 1 < len(index_titles):
-                next_title_norm = index_titles[i_title+1][2]
-                try:
-                    next_candidates = [i for i, n in enumerate(paras_norm) 
-                                       if i > match_idx + 20 and n == next_title_norm]
-                    if next_candidates: 
-                        search_end_limit = next_candidates[0]
-                except Exception: 
-                    pass
-
-            body_start = next((i+1 for i in range(pub_idx+1, search_end_limit) if paras[i].text.strip().lower() == "body"), None)
+                next_positions = norm_pos.get(index_titles[i_title+1][2], [])
+                k = bisect_right(next_positions, match_idx + 20)
+                if k < len(next_positions): 
+                    search_end_limit = next_positions[k]
+
+            body_start = next((i+1 for i in range(pub_idx+1, search_end_limit) if paras[i].strip().lower() == "body"), None)
             if body_start is None: 
                 body_start = pub_idx + 1
             
             body_end = len(paras)
             for i in range(body_start, search_end_limit):
-                t_low = paras[i].text.strip().lower()
+                t_low = paras[i].strip().lower()
                 if t_low.startswith("notes") or t_low.startswith("classification") or "(end) dow jones" in t_low:
                     body_end = i
                     break
             last_article_end_idx = body_end
 
-            article = " ".join(clean_text(paras[i].text) for i in range(body_start, body_end))
+            article = " ".join(clean_text(paras[i]) for i in range(body_start, body_end))
             raw_sents = [s.strip() for s in re.split(r"\.\s*", article) if len(s.strip())>=20]
 
-            if state.USE_SEMANTIC_FILTER and raw_sents:
-                if not hasattr(extract_sentences_by_titles, "anchor_vec"):
-                     extract_sentences_by_titles.anchor_vec = model_emb.encode([ANCHOR_TEXT], normalize_embeddings=True)[0]
-                
-                sent_vecs = model_emb.encode(raw_sents, normalize_embeddings=True)
-                sim_scores = np.dot(sent_vecs, extract_sentences_by_titles.anchor_vec)
-            else:
-                sim_scores = [0.0] * len(raw_sents)
-
-            for i, sent in enumerate(raw_sents):
-                is_hit = False
-                match_reason = ""
-                hit_count = 0
-
-                if state.USE_SEMANTIC_FILTER:
-                    score = float(sim_scores[i])
-                    if score > 0.45:
-                        is_hit = True
-                        hit_count = 1
-                        match_reason = f"Semantic({score:.2f})"
-                else:
-                    hits = [k for k in state.KEYWORD_ROOTS if k in sent.lower()]
-                    if hits:
-                        is_hit = True
-                        hit_count = len(hits)
-                        match_reason = "; ".join(hits)
-                
-                if is_hit:
-                    recs.append({
-                        "Title": title_raw,
-                        "Publisher": publisher,
-                        "Date": news_date,
-                        "Country": "",
-                        "Sentence": sent,
-                        "Hit_Count": hit_count,
-                        "Matched_Keywords": match_reason
-                    })
-        
-        if recs: 
-            return recs
-
-    for sent in extract_sentences(Path(filepath)):
-        hits = [k for k in state.KEYWORD_ROOTS if k in sent.lower()]
-        if hits:
-             recs.append({
-                "Title": "", "Publisher": "", "Date": "", "Country": "", 
-                "Sentence": sent, "Hit_Count": len(hits), 
-                "Matched_Keywords": "; ".join(hits)
+            articles.append({
+                "Title": title_raw,
+                "Publisher": publisher,
+                "Date": news_date,
+                "Sentences": raw_sents,
             })
-    return recs
 
-def extract_sentences_from_factiva(filepath: str) -> List[Dict]:
-    text = read_rtf_text(Path(filepath))
-    records = parse_records_from_text(text)
-    recs: List[Dict] = []
+    return {
+        "articles": articles,
+        "fallback": _split_fallback_sentences(paras),
+    }
 
-    for record in records:
-        raw_sents = [s.strip() for s in re.split(r"\.\s*", record.body) if len(s.strip()) >= 20]
-        for hit in _filter_sentences(raw_sents):
+def _article_sentences(articles: List[Dict]) -> List[str]:
+    return [sent for art in articles for sent in art["Sentences"]]
+
+def _records_from_articles(articles: List[Dict], scores=None) -> List[Dict]:
+    """
+    scores：语义过滤时，按 _article_sentences(articles) 顺序排列的相似度。
+    不传则整个文件的句子一次性分批编码（而不是每篇文章各编码一次）。
+    """
+    if state.USE_SEMANTIC_FILTER and scores is None:
+        scores = _semantic_scores(_article_sentences(articles))
+    recs: List[Dict] = []
+    offset = 0
+    for art in articles:
+        n = len(art["Sentences"])
+        art_scores = scores[offset:offset + n] if scores is not None else None
+        offset += n
+        for hit in _filter_sentences(art["Sentences"], art_scores):
             recs.append({
-                "Title": record.title,
-                "Publisher": record.publisher,
-                "Date": record.date_yyyy_mm_dd,
+                "Title": art["Title"],
+                "Publisher": art["Publisher"],
+                "Date": art["Date"],
                 "Country": "",
                 "Sentence": hit["Sentence"],
                 "Hit_Count": hit["Hit_Count"],
                 "Matched_Keywords": hit["Matched_Keywords"]
             })
     return recs
-    
+
+def _records_from_lexis(parsed: Dict, scores=None) -> List[Dict]:
+    recs = _records_from_articles(parsed["articles"], scores)
+    if recs: 
+        return recs
+
+    matcher = get_keyword_matcher(state.KEYWORD_ROOTS)
+    for sent in parsed["fallback"]:
+        hits = matcher.find(sent)
+        if hits:
+             recs.append({
+                "Title": "", "Publisher": "", "Date": "", "Country": "", 
+                "Sentence": sent, "Hit_Count": len(hits), 
+                "Matched_Keywords": "; ".join(hits)
+            })
+    return recs
+
+def parse_factiva_articles(source: Union[str, BinaryIO]) -> Dict:
+    # 逐条记录流式解析，不再把整个 RTF 解码成一个大字符串
+    articles = []
+    for record in iter_records(source):
+        raw_sents = [s.strip() for s in re.split(r"\.\s*", record.body) if len(s.strip()) >= 20]
+        articles.append({
+            "Title": record.title,
+            "Publisher": record.publisher,
+            "Date": record.date_yyyy_mm_dd,
+            "Sentences": raw_sents,
+        })
+    return {"articles": articles}
+
+def _load_parsed(source: Union[str, BinaryIO], kind: str, parser) -> Tuple[Dict, bool]:
+    """
+    先查内容哈希缓存（文件内容 + PARSER_VERSION），未命中才真正解析 docx/rtf。
+    source 可以是路径，也可以是 zip 成员的二进制流。
+    返回 (解析结果, 是否命中缓存)。
+    """
+    if not state.USE_EXTRACT_CACHE:
+        return parser(source), False
+    key = f"{kind}-v{PARSER_VERSION}-{file_digest(source)}"
+    parsed = cache_load(key)
+    if parsed is not None:
+        return parsed, True
+    parsed = parser(source)
+    cache_store(key, parsed)
+    return parsed, False
+
+def extract_sentences_by_titles(filepath: str) -> List[Dict]:
+    parsed, _ = _load_parsed(filepath, "lexis", parse_lexis_articles)
+    return _records_from_lexis(parsed)
+
+def extract_sentences_from_factiva(filepath: str) -> List[Dict]:
+    parsed, _ = _load_parsed(filepath, "factiva", parse_factiva_articles)
+    return _records_from_articles(parsed["articles"])
+
+def _init_extract_worker(keyword_roots: List[str], use_semantic: bool, extract_mode: str,
+                         use_cache: bool, dedup: bool) -> None:
+    # 子进程不继承主进程里 apply_options_to_state 写入的 state
+    state.KEYWORD_ROOTS = keyword_roots
+    state.USE_SEMANTIC_FILTER = use_semantic
+    state.EXTRACT_MODE = extract_mode
+    state.USE_EXTRACT_CACHE = use_cache
+    state.DEDUP_ARTICLES = dedup
+
+@dataclass
+class _FileResult:
+    """单个文件在 Step-1 流水线中的中间结果（子进程 → 去重 → 语义打分 → 记录）。"""
+    task: InputFile
+    pid: int
+    elapsed: float
+    cache_hit: bool
+    meta: List[Tuple[str, str, str]]                  # 各文章 (Title, Publisher, Date)
+    signatures: List[Optional[np.ndarray]]            # 各文章正文的 MinHash；未去重时为空
+    parsed: Optional[Dict] = None                     # 语义模式：等待主进程批量打分
+    groups: Optional[List[List[Dict]]] = None         # 按文章分组的命中记录（Lexis 回退记录在最后一组）
+    dropped: Set[int] = field(default_factory=set)    # 判为近重复、不再进入 NLP 的文章下标
+
+    def records(self) -> List[Dict]:
+        return [r for i, g in enumerate(self.groups) if i not in self.dropped for r in g]
+
+def _build_groups(task: InputFile, parsed: Dict, scores=None, dropped: Set[int] = frozenset()) -> List[List[Dict]]:
+    """
+    按文章分组生成命中记录；scores 只覆盖未被去重的文章（顺序同 _article_sentences）。
+    Lexis 回退路径与原来一样只在所有文章都没有命中时启用；
+    文件里有文章被判为重复时不启用（重复文章的命中已记在代表文章上）。
+    """
+    articles = parsed["articles"]
+    groups: List[List[Dict]] = []
+    offset = 0
+    for i, art in enumerate(articles):
+        if i in dropped:
+            groups.append([])
+            continue
+        n = len(art["Sentences"])
+        art_scores = scores[offset:offset + n] if scores is not None else None
+        offset += n
+        groups.append(_records_from_articles([art], art_scores))
+
+    if state.EXTRACT_MODE != ExtractMode.FACTIVA.value and not dropped and not any(groups):
+        fallback = _records_from_lexis({"articles": [], "fallback": parsed["fallback"]})
+        for r in fallback:
+            if not r["Title"]:
+                r["Title"] = Path(task.filename).stem
+        groups.append(fallback)
+
+    for g in groups:
+        for r in g:
+            r.update({"Tier_1": task.tier1, "Tier_2": task.tier2, "Filename": task.filename})
+    return groups
+
+def _extract_file(task: InputFile) -> _FileResult:
+    """
+    解析单个文件，并在子进程里算好各文章的 MinHash 签名。
+    关键词模式下直接筛好句子；语义模式下只返回解析结果，
+    句向量由主进程跨文件攒批计算（见 _semantic_stage）。
+    """
+    t0 = time.perf_counter()
+    source = task.source()
+    try:
+        if state.EXTRACT_MODE == ExtractMode.FACTIVA.value:
+            parsed, cache_hit = _load_parsed(source, "factiva", parse_factiva_articles)
+        else:
+            parsed, cache_hit = _load_parsed(source, "lexis", parse_lexis_articles)
+    finally:
+        if not isinstance(source, str):
+            source.close()
+    articles = parsed["articles"]
+    res = _FileResult(
+        task=task, pid=os.getpid(), elapsed=0.0, cache_hit=cache_hit,
+        meta=[(a["Title"], a["Publisher"], a["Date"]) for a in articles],
+        signatures=[minhash_signature(" ".join(a["Sentences"])) for a in articles]
+        if state.DEDUP_ARTICLES else [],
+    )
+    if state.USE_SEMANTIC_FILTER:
+        res.parsed = parsed
+    else:
+        res.groups = _build_groups(task, parsed)
+    res.elapsed = time.perf_counter() - t0
+    return res
+
+DUPLICATE_COLUMNS = [
+    "Tier_1", "Tier_2", "Filename", "Title", "Publisher", "Date",
+    "Canonical_Filename", "Canonical_Title", "Canonical_Publisher", "Canonical_Date", "Similarity",
+]
+
+def _dedup_stage(results: Iterator[_FileResult], threshold: float, stats: Dict) -> Iterator[_FileResult]:
+    """
+    跨文件的近重复文章检测（MinHash + LSH）。按文件顺序，先出现的文章作为代表进入 NLP，
+    之后的近重复文章不再处理，其 Title/Publisher/Date 记入 article_duplicates.csv。
+    """
+    index = LshIndex(threshold)
+    out_path = BASE_DIR / "article_duplicates.csv"
+    out_path.unlink(missing_ok=True)  # 旧结果不再有效
+    fp = None
+    writer = None
+    try:
+        for res in results:
+            task = res.task
+            for i, sig in enumerate(res.signatures):
+                if sig is None:
+                    continue
+                title, publisher, date = res.meta[i]
+                dup = index.find_or_add(sig, (task.filename, title, publisher, date))
+                if dup is None:
+                    continue
+                res.dropped.add(i)
+                stats["duplicates"] += 1
+                (c_file, c_title, c_pub, c_date), sim = dup
+                if writer is None:
+                    fp = open(out_path, "w", encoding="utf-8-sig", newline="")
+                    writer = csv.writer(fp)
+                    writer.writerow(DUPLICATE_COLUMNS)
+                writer.writerow([task.tier1, task.tier2, task.filename, title, publisher, date,
+                                 c_file, c_title, c_pub, c_date, f"{sim:.2f}"])
+            # 关键词模式下 groups 已在子进程中按“未去重”生成：有文章被判为重复时，
+            # 与语义路径一样不启用 Lexis 回退组（回退文本来自这些重复文章）
+            if res.dropped and res.groups is not None and len(res.groups) > len(res.meta):
+                res.groups.pop()
+            stats["articles"] += len(res.signatures)
+            yield res
+    finally:
+        if fp is not None:
+            fp.close()
+
+def _semantic_stage(results: Iterator[_FileResult], batch_size: int, stats: Dict) -> Iterator[_FileResult]:
+    """
+    把各文件（去重后保留的文章）的句子攒成固定大小（batch_size）的批次统一编码打分，
+    再按原文件顺序产出已填好 groups 的结果。
+    只有被当前批次覆盖到的文件会暂存在内存里。
+    """
+    waiting = deque()   # [res, scores, 已打分句数]，按文件顺序
+    queue: List[str] = []
+    owners = deque()    # queue 中各段句子对应的文件：[entry, 句数]
+
+    def _flush(n: int) -> None:
+        batch = queue[:n]
+        del queue[:n]
+        t0 = time.perf_counter()
+        scores = _encode_scores(batch)
+        stats["encode_time"] += time.perf_counter() - t0
+        stats["batches"] += 1
+        stats["sentences"] += len(batch)
+        pos = 0
+        while pos < len(batch):
+            seg = owners[0]
+            take = min(seg[1], len(batch) - pos)
+            entry = seg[0]
+            entry[1][entry[2]:entry[2] + take] = scores[pos:pos + take]
+            entry[2] += take
+            pos += take
+            seg[1] -= take
+            if seg[1] == 0:
+                owners.popleft()
+
+    def _ready() -> Iterator[_FileResult]:
+        while waiting and waiting[0][2] == len(waiting[0][1]):
+            res, scores, _ = waiting.popleft()
+            res.groups = _build_groups(res.task, res.parsed, scores, res.dropped)
+            res.parsed = None
+            yield res
+
+    for res in results:
+        kept = [a for i, a in enumerate(res.parsed["articles"]) if i not in res.dropped]
+        sents = _article_sentences(kept)
+        entry = [res, np.zeros(len(sents), dtype=np.float32), 0]
+        waiting.append(entry)
+        if sents:
+            queue.extend(sents)
+            owners.append([entry, len(sents)])
+        while len(queue) >= batch_size:
+            _flush(batch_size)
+        yield from _ready()
+    if queue:
+        _flush(len(queue))
+    yield from _ready()
+
+def _resolve_workers(n: int) -> int:
+    if n <= 0:
+        return os.cpu_count() or 1
+    return n
+
+def _iter_extract_results(files: List[InputFile], workers: int) -> Iterator[_FileResult]:
+    if workers <= 1:
+        yield from map(_extract_file, files)
+        return
+
+    # 只保留有限个在途任务：下游消费慢时，已完成的结果不会在内存里堆积
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_extract_worker,
+        initargs=(list(state.KEYWORD_ROOTS), state.USE_SEMANTIC_FILTER, state.EXTRACT_MODE,
+                  state.USE_EXTRACT_CACHE, state.DEDUP_ARTICLES),
+    )
+    try:
+        pending = deque()
+        it = iter(files)
+        for task in itertools.islice(it, workers * 2):
+            pending.append(pool.submit(_extract_file, task))
+        while pending:
+            res = pending.popleft().result()
+            for task in itertools.islice(it, 1):
+                pending.append(pool.submit(_extract_file, task))
+            yield res
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def iter_sentence_records(files: List[InputFile],
+                          desc: str,
+                          chunk_size: int = 5000) -> Iterator[List[Dict]]:
+    """
+    按文件顺序惰性产出命中句记录，每次产出一批（最多 chunk_size 条）。
+    全部产出完毕后打印 Step-1 的统计信息。
+    """
+    workers = min(_resolve_workers(state.EXTRACT_WORKERS), max(len(files), 1))
+    worker_stats: Dict[int, List[float]] = {}
+    t_start = time.perf_counter()
+    total = 0
+    cache_hits = 0
+    buf: List[Dict] = []
+
+    results = tqdm(_iter_extract_results(files, workers), total=len(files), desc=desc)
+    dedup_stats = {"articles": 0, "duplicates": 0}
+    if state.DEDUP_ARTICLES:
+        results = _dedup_stage(results, state.DEDUP_THRESHOLD, dedup_stats)
+    sem_stats = {"sentences": 0, "batches": 0, "encode_time": 0.0}
+    if state.USE_SEMANTIC_FILTER:
+        results = _semantic_stage(results, max(1, state.SEMANTIC_BATCH_SIZE), sem_stats)
+
+    for res in results:
+        recs = res.records()
+        st = worker_stats.setdefault(res.pid, [0, 0, 0.0])
+        st[0] += 1
+        st[1] += len(recs)
+        st[2] += res.elapsed
+        total += len(recs)
+        cache_hits += res.cache_hit
+        buf.extend(recs)
+        while len(buf) >= chunk_size:
+            yield buf[:chunk_size]
+            buf = buf[chunk_size:]
+    if buf:
+        yield buf
+
+    wall = time.perf_counter() - t_start
+    if worker_stats:
+        lines = []
+        for i, (pid, (n_files, n_recs, busy)) in enumerate(sorted(worker_stats.items()), 1):
+            rate = n_files / busy if busy > 0 else 0.0
+            lines.append(f"#{i} (pid {pid}): {n_files} files / {n_recs} recs / {busy:.1f}s / {rate:.2f} files/s")
+        summary = "\n".join(lines)
+        cute_box(
+            f"Step-1 并行度 {workers}，总耗时 {wall:.1f}s\n" + summary,
+            f"Step-1 並列数 {workers}／合計 {wall:.1f}s\n" + summary,
+            "⚙️"
+        )
+
+    if state.DEDUP_ARTICLES:
+        n_dup = dedup_stats["duplicates"]
+        cute_box(
+            f"近重复文章 {n_dup}/{dedup_stats['articles']} 篇已跳过（只保留首次出现的一篇做 NLP）"
+            + ("\nresult.csv 不含这些文章的句子，其 Tier/文件与对应的代表文章记录在 article_duplicates.csv"
+               if n_dup else ""),
+            f"重複記事 {n_dup}/{dedup_stats['articles']} 件をスキップ（最初の1件のみ NLP 処理）"
+            + ("\nresult.csv にはこれらの記事の文は含まれません。Tier・ファイルと代表記事は article_duplicates.csv に記録"
+               if n_dup else ""),
+            "🪞"
+        )
+
+    if state.USE_SEMANTIC_FILTER:
+        n_sent, t_enc = sem_stats["sentences"], sem_stats["encode_time"]
+        rate = n_sent / t_enc if t_enc > 0 else 0.0
+        cute_box(
+            f"语义过滤：{n_sent} 句 / {sem_stats['batches']} 批（每批 {state.SEMANTIC_BATCH_SIZE}）"
+            f" / 编码 {t_enc:.1f}s / {rate:.0f} 句/s",
+            f"意味フィルタ：{n_sent} 文 / {sem_stats['batches']} バッチ（{state.SEMANTIC_BATCH_SIZE} 文ずつ）"
+            f" / エンコード {t_enc:.1f}s / {rate:.0f} 文/s",
+            "🧠"
+        )
+
+    if state.USE_EXTRACT_CACHE:
+        cute_box(
+            f"抽取缓存命中 {cache_hits}/{len(files)} 个文件（仅重新解析新增或修改的文件）",
+            f"抽出キャッシュ ヒット {cache_hits}/{len(files)} ファイル（新規・変更ファイルのみ再解析）",
+            "💾"
+        )
+
+    cute_box(
+        f"Step-1 完成，共 {total} 条记录",
+        f"Step-1 完了しました：全{total}件",
+        "✅"
+    )
+
 def step1():
     cute_box(
         "Step-1：提取 Word 句子 中…",
         "Step-1：文抽出中…",
         "📄"
     )
-    all_recs: List[Dict] = []
 
     if state.EXTRACT_MODE == ExtractMode.FACTIVA.value:
-        rtf_files = []
-        for root, _, files in os.walk(BASE_DIR):
-            for fname in files:
-                if not fname.endswith(".rtf") or fname.startswith("~$"):
-                    continue
-                full = Path(root) / fname
-                rel = full.relative_to(BASE_DIR).parts
-                tier1 = rel[0] if len(rel) >= 1 else ""
-                tier2 = rel[1] if len(rel) >= 2 else ""
-                rtf_files.append((str(full), tier1, tier2, fname))
-
-        for fp, t1, t2, fname in tqdm(rtf_files, desc="🗂️ 处理 Factiva RTF 文件"):
-            for r in extract_sentences_from_factiva(fp):
-                r.update({"Tier_1": t1, "Tier_2": t2, "Filename": fname})
-                all_recs.append(r)
+        files = list_input_files(".rtf", state.INPUT_ARCHIVE)
+        desc = "🗂️ 处理 Factiva RTF 文件"
     else:
-        docx_files = []
-        for root, _, files in os.walk(BASE_DIR):
-            for fname in files:
-                if not fname.endswith(".docx") or fname.startswith("~$"):
-                    continue
-                full = Path(root) / fname
-                rel = full.relative_to(BASE_DIR).parts
-                tier1 = rel[0] if len(rel) >= 1 else ""
-                tier2 = rel[1] if len(rel) >= 2 else ""
-                docx_files.append((str(full), tier1, tier2, fname))
-
-        for fp, t1, t2, fname in tqdm(docx_files, desc="📄 处理 Word 文件"):
-            for r in extract_sentences_by_titles(fp):
-                if not r["Title"]:
-                    r["Title"] = Path(fname).stem
-                r.update({"Tier_1": t1, "Tier_2": t2, "Filename": fname})
-                all_recs.append(r)
-
-    state.SENTENCE_RECORDS = all_recs
+        files = list_input_files(".docx", state.INPUT_ARCHIVE)
+        desc = "📄 处理 Word 文件"
+
+    # 不在这里一次性读完：Step-2 按批消费，内存峰值只取决于 chunk 大小
+    state.SENTENCE_STREAM = iter_sentence_records(files, desc, state.RECORD_CHUNK_SIZE)
     cute_box(
-        f"Step-1 完成，共 {len(all_recs)} 条记录",
-        f"Step-1 完了しました：全{len(all_recs)}件",
-        "✅"
+        f"Step-1 已就绪，共 {len(files)} 个文件，将在 Step-2 中按批（{state.RECORD_CHUNK_SIZE} 条）流式读取",
+        f"Step-1 準備完了：{len(files)} ファイル、Step-2 で {state.RECORD_CHUNK_SIZE} 件ずつ逐次処理します",
+        "📦"
     )
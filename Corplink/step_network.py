@@ -12,7 +12,7 @@ def step4():
     
     meta_cols = ["Tier_1", "Tier_2", "Filename", "Date", 
                  "Title", "Publisher", "Sentence", 
-                 "Hit_Count", "Matched_Keywords"]
+                 "Hit_Count", "Matched_Keywords", "Occurrences"]
 
     for _, r in tqdm(df.iterrows(), desc="生成邻接表", total=len(df)):
         comps = [r[f"company_{i}"] 
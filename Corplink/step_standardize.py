@@ -1,12 +1,13 @@
 # coding: utf-8
 import random
 from datetime import datetime
-import re
 import pandas as pd
 from sqlalchemy import create_engine, text
 
 from .env_bootstrap import cute_box
+from .company_dedup import ContainmentDeduper, write_row_names
 from .constants import BASE_DIR
+from .lexicon import CompanyLexicon
 from .step_company import dedup_company_cols
 
 def step3(mysql_url: str):
@@ -28,15 +29,12 @@ def step3(mysql_url: str):
 
     engine = create_engine(mysql_url)
     with engine.begin() as conn:
-        ban_set    = {r[0] for r in conn.execute(text("SELECT alias FROM ban_list"))}
-        canon_map  = {r[0]: r[1] for r in conn.execute(text("SELECT id, canonical_name FROM company_canonical"))}
-        alias_map  = {r[0]: r[1] for r in conn.execute(text(
-            "SELECT a.alias, c.canonical_name FROM company_alias a "
-            "JOIN company_canonical c ON a.canonical_id=c.id"
-        ))}
-        ban_lower       = {b.lower() for b in ban_set}
-        alias_lower_map = {a.lower(): c for a, c in alias_map.items()}
-        canon_lower2id  = {name.lower(): cid for cid, name in canon_map.items()}
+        lexicon = CompanyLexicon.from_db(conn)
+    # 下面的映射会随本批写入同步更新
+    ban_lower       = lexicon.ban_lower
+    canon_map       = lexicon.canon_id2name
+    alias_lower_map = lexicon.alias_lower
+    canon_lower2id  = lexicon.canon_lower2id
 
     for idx, row in df_map.iterrows():
         alias_raw   = row["Alias"].strip()
@@ -116,26 +114,18 @@ def step3(mysql_url: str):
     df_map.to_csv(todo_f, index=False, encoding="utf-8-sig")
 
     with engine.begin() as conn2:
-        ban_set2    = {r[0] for r in conn2.execute(text("SELECT alias FROM ban_list"))}
-        rows2       = conn2.execute(text(
-            "SELECT a.alias, c.canonical_name FROM company_alias a "
-            "JOIN company_canonical c ON a.canonical_id=c.id"
-        ))
-        alias_map2  = {a: c for a, c in rows2}
-        canon_set2  = {r[0] for r in conn2.execute(text("SELECT canonical_name FROM company_canonical"))}
-
-    ban_lower2        = {b.lower() for b in ban_set2}
-    alias_lower_map2  = {a.lower(): c for a, c in alias_map2.items()}
-    canon_lower2orig2 = {c.lower(): c for c in canon_set2}
+        lexicon2 = CompanyLexicon.from_db(conn2)
 
-    comp_cols = [c for c in df_res.columns if c.startswith("company_")]
+    ban_lower2        = lexicon2.ban_lower
+    alias_lower_map2  = lexicon2.alias_lower
+    canon_lower2orig2 = lexicon2.canon_lower2orig
 
-    def _norm_key(s: str) -> str:
-        return re.sub(r"[^A-Za-z0-9]", "", str(s)).lower()
+    comp_cols = [c for c in df_res.columns if c.startswith("company_")]
 
     changed_cells = 0
-    for ridx in df_res.index:
-        orig = df_res.loc[ridx, comp_cols].astype(str).tolist()
+    orig_rows = df_res[comp_cols].astype(str).to_numpy().tolist()
+    mapped_rows = []
+    for orig in orig_rows:
         vals_in = [v.strip() for v in orig if v.strip()]
         vals_out = []
         for nm in vals_in:
@@ -152,18 +142,12 @@ def step3(mysql_url: str):
                     changed_cells += 1
                 nm = corrected
             vals_out.append(nm)
-        cleaned, seen = [], set()
-        for nm in sorted(vals_out, key=len, reverse=True):
-            k = _norm_key(nm)
-            if any(k in kk or kk in k for kk in seen):
-                continue
-            cleaned.append(nm)
-            seen.add(k)
-        for i, col in enumerate(comp_cols):
-            new_val = cleaned[i] if i < len(cleaned) else ""
-            if str(df_res.at[ridx, col]) != new_val:
-                changed_cells += 1
-            df_res.at[ridx, col] = new_val
+        mapped_rows.append(vals_out)
+
+    cleaned_rows = ContainmentDeduper().dedup_rows(mapped_rows)
+    for orig, cleaned in zip(orig_rows, cleaned_rows):
+        changed_cells += sum(o != (cleaned[i] if i < len(cleaned) else "") for i, o in enumerate(orig))
+    write_row_names(df_res, comp_cols, cleaned_rows)
 
     df_res = dedup_company_cols(df_res)
 
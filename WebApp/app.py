@@ -163,6 +163,8 @@ BASE_DIR = "/var/www/html/app/CorpLink-AI"
 WORKSPACE_DIR = os.path.join(BASE_DIR, "temp_uploads")
 
 FILTER_WORKSPACE_DIR = os.path.join(BASE_DIR, "filter_workspace")
+# 磁盘缓存（抽取 / 句向量 / NER / canonical 索引）放在沙盒之外，每次上传清空 WORKSPACE_DIR 时保留
+CACHE_DIR = os.path.join(BASE_DIR, "corplink_cache")
 os.makedirs(FILTER_WORKSPACE_DIR, exist_ok=True)
 
 @app.get("/", response_class=HTMLResponse)
@@ -182,7 +184,8 @@ async def upload_files(
     keyword_mode: str = Form(...),         
     custom_keywords: str = Form(""),       
     db_mode: str = Form(...),              
-    custom_db_url: str = Form("")          
+    custom_db_url: str = Form(""),         
+    extract_upload: str = Form("n")        # "y"：按旧方式解压到沙盒；默认直接读取 zip
 ):
     logger.info(f"=== 新しいタスクを受信しました: ファイル名 {file.filename} ===")
     logger.info(f"パラメータ: extract_mode={extract_mode}, keyword_mode={keyword_mode}, db_mode={db_mode}")
@@ -221,16 +224,20 @@ async def upload_files(
         # 3. 处理用户上传的文件
         logger.info("ユーザーファイルの配置中...")
         filename = file.filename.lower()
+        input_zip = ""
         if filename.endswith('.zip'):
-            # 如果是 zip，先保存为临时文件，再解压到当前工作目录，完美保留层级
             temp_upload_zip = os.path.join(WORKSPACE_DIR, "temp_upload.zip")
             with open(temp_upload_zip, "wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
-            
-            with zipfile.ZipFile(temp_upload_zip, 'r') as zip_ref:
-                zip_ref.extractall(WORKSPACE_DIR)
-                
-            os.remove(temp_upload_zip) # 解压后删除临时 zip 文件
+
+            if extract_upload == "y":
+                # 旧方式：解压到当前工作目录，完美保留层级
+                with zipfile.ZipFile(temp_upload_zip, 'r') as zip_ref:
+                    zip_ref.extractall(WORKSPACE_DIR)
+                os.remove(temp_upload_zip) # 解压后删除临时 zip 文件
+            else:
+                # 默认：不解压，Step-1 直接按成员路径读取 zip（Tier 层级相同，磁盘 I/O 减半）
+                input_zip = "temp_upload.zip"
             
         elif filename.endswith('.docx') or filename.endswith('.rtf'):
             # 如果是 docx 或 rtf，直接保存在沙盒根目录
@@ -250,9 +257,13 @@ async def upload_files(
             "ai_level": "3",             # 强制全自动
             "overwrite_existing": "y",   # 强制继续
             "run_ai_autofill": "y",      # 强制AI清洗
-            "confirm_standardize": "y"   # 强制不确认直接入库
+            "confirm_standardize": "y",  # 强制不确认直接入库
+            "extract_workers": 0         # Step-1 按 CPU 核数并行
         }
         
+        if input_zip:
+            config_data["input_zip"] = input_zip
+
         # 处理自定义关键词 (如果用户选择了 2，则把逗号分隔的字符串转成列表)
         if keyword_mode == "2" and custom_keywords.strip():
             keys_list = [k.strip() for k in custom_keywords.replace("，", ",").split(",") if k.strip()]
@@ -275,6 +286,7 @@ async def upload_files(
         run_env["OPENAI_API_KEY"] = openai_api_key.strip()
         
         run_env["PYTHONUNBUFFERED"] = "1"
+        run_env.setdefault("CORPLINK_CACHE_DIR", CACHE_DIR)
 
         log_file_path = os.path.join(WORKSPACE_DIR, "run.log")
         logger.info("サブプロセス (launcher.py) の実行を開始します...")
@@ -0,0 +1,54 @@
+# coding: utf-8
+"""
+docx 段落读取基准：python-docx 对象模型 vs 流式解析 word/document.xml。
+比较耗时、tracemalloc 峰值内存，并确认两者得到的段落文本一致。
+
+    python benchmarks/bench_docx_reader.py [n_articles]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from docx import Document
+
+from bench_lexis_alignment import build_docx
+from Corplink.lexis_docx import iter_paragraph_texts
+
+def python_docx_texts(path: str):
+    # 旧实现的访问模式：先建完整对象模型，再逐段取 .text
+    return [p.text for p in Document(path).paragraphs]
+
+def streaming_texts(path: str):
+    return list(iter_paragraph_texts(path))
+
+def measure(fn, path: str):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(path)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / f"synthetic_{n}.docx")
+        build_docx(Path(path), n)
+
+        ref, t_ref, m_ref = measure(python_docx_texts, path)
+        new, t_new, m_new = measure(streaming_texts, path)
+        assert ref == new, "paragraph texts differ"
+
+        print(f"{len(ref)} paragraphs")
+        print(f"python-docx : {t_ref:.2f}s  peak {m_ref / 2**20:.1f} MiB")
+        print(f"streaming   : {t_new:.2f}s  peak {m_new / 2**20:.1f} MiB")
+        print(f"speedup x{t_ref / max(t_new, 1e-9):.1f}, memory x{m_ref / max(m_new, 1):.1f} lower")
+
+if __name__ == "__main__":
+    main()
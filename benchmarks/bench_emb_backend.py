@@ -0,0 +1,147 @@
+# coding: utf-8
+"""
+句向量后端基准：torch（fp32）vs int8（动态量化）vs onnx。
+以 torch fp32 的向量为基准，检查各后端在流水线实际使用的阈值上是否给出同样的判断：
+  - 语义过滤：句子与 ANCHOR_TEXT 的相似度 > 0.45；
+  - canonical 向量匹配：别名最近的 canonical 及相似度 ≥ 0.82；
+  - 垃圾词评分：与 NOISE_CONCEPTS 的最大相似度 > 0.4 / 0.6 / 0.8。
+并测量每个后端的加载时间与编码吞吐（句/秒，batch_size=32，与 encode_texts 默认一致）。
+不经过向量缓存。给定 result.csv 时用其中的 Sentence 与 company_* 列，否则用合成文本。
+
+    python benchmarks/bench_emb_backend.py [backends] [result.csv] [n_texts]
+    python benchmarks/bench_emb_backend.py torch,int8,onnx result.csv 5000
+
+已有结果（2026-10，1 核 CPU，torch 2.14 / sentence-transformers 5.7 / onnxruntime 1.31，合成文本 2000 句）：
+  由于环境无法下载 all-MiniLM-L6-v2 权重，用同结构（6 层、384 维、mean pooling）的随机初始化模型测速；
+  吞吐只取决于结构，可以参考，精度一致率则没有意义，仍需用真实模型重跑。
+    torch fp32  191 句/秒
+    int8        312 句/秒（1.63×）
+    onnx        163 句/秒（0.85×，未做图优化 / 量化的导出在单核上不比 torch 快）
+  在真实模型上的一致率出来之前，int8 / onnx 不作为运行选项开放（state.EMB_BACKEND 固定为 torch）。
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Corplink.constants import ANCHOR_TEXT, NOISE_CONCEPTS
+from Corplink.model_utils import EMB_BACKENDS, load_embedder
+
+_SYL = ["ac", "me", "no", "va", "tri", "gen", "bio", "tek", "lu", "xi", "zor", "pha", "med", "sol", "ka", "ri"]
+_SUFFIX = ["Inc", "Ltd", "Corp", "Holdings", "Group", "Therapeutics", "Systems", "AG", ""]
+_TEMPLATES = [
+    "{a} announced a strategic partnership with {b} to develop AI-based diagnostic tools.",
+    "{a} signed a licensing agreement with {b} covering its imaging software.",
+    "Shares of {a} rose 3% in the second quarter after revenue beat estimates.",
+    "{a} and {b} will jointly deploy machine learning models across hospitals in Europe.",
+    "The company reported net income of $12 million for fiscal 2024.",
+    "{a} acquired a minority stake in {b} for an undisclosed amount.",
+    "Analysts expect {a} to expand its cloud services to healthcare providers next year.",
+]
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYL) for _ in range(rng.randint(2, 4))).capitalize()
+
+def _name(rng: random.Random) -> str:
+    parts = [_word(rng) for _ in range(rng.randint(1, 2))]
+    suffix = rng.choice(_SUFFIX)
+    return " ".join(parts + ([suffix] if suffix else []))
+
+def synth(n_texts: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    rng = random.Random(seed)
+    names = list(dict.fromkeys(_name(rng) for _ in range(n_texts)))
+    sents = [rng.choice(_TEMPLATES).format(a=rng.choice(names), b=rng.choice(names)) for _ in range(n_texts)]
+    return sents, names
+
+def from_csv(path: str, n_texts: int) -> Tuple[List[str], List[str]]:
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    sents = list(dict.fromkeys(df["Sentence"].tolist()))[:n_texts]
+    comp_cols = [c for c in df.columns if c.startswith("company_")]
+    names = list(dict.fromkeys(v for v in df[comp_cols].to_numpy().ravel() if v))[:n_texts]
+    return sents, names
+
+def _alias(rng: random.Random, name: str) -> str:
+    # 模拟别名：去掉/换掉后缀，或加一点拼写噪声
+    toks = name.split()
+    if len(toks) > 1 and rng.random() < 0.5:
+        return " ".join(toks[:-1])
+    chars = list(name)
+    chars.insert(rng.randrange(len(chars) + 1), rng.choice("aeiou"))
+    return "".join(chars)
+
+def _agree(a: np.ndarray, b: np.ndarray) -> str:
+    return f"{np.mean(a == b) * 100:.2f}%（不一致 {int(np.sum(a != b))}）"
+
+def main() -> None:
+    backends = sys.argv[1].split(",") if len(sys.argv) > 1 else list(EMB_BACKENDS)
+    csv_path = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+    n_texts = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    sents, names = from_csv(csv_path, n_texts) if csv_path else synth(n_texts)
+    rng = random.Random(1)
+    canon = names[: max(1, len(names) // 2)]
+    aliases = [_alias(rng, n) for n in canon[: len(canon) // 2]] + names[len(canon):]
+    print(f"句子 {len(sents)}  canonical {len(canon)}  别名 {len(aliases)}")
+
+    results = {}
+    for backend in (["torch"] + [b for b in backends if b != "torch"]):
+        try:
+            t0 = time.perf_counter()
+            model = load_embedder(backend)
+            t_load = time.perf_counter() - t0
+        except Exception as e:
+            print(f"[{backend}] 加载失败，跳过：{e}")
+            continue
+
+        def enc(texts, batch_size=32):
+            return np.asarray(model.encode(texts, batch_size=batch_size, normalize_embeddings=True),
+                              dtype=np.float32)
+
+        enc(sents[:64])  # 预热
+        t0 = time.perf_counter()
+        sent_vecs = enc(sents)
+        t_enc = time.perf_counter() - t0
+        results[backend] = {
+            "sent": sent_vecs,
+            "anchor": enc([ANCHOR_TEXT])[0],
+            "canon": enc(canon, batch_size=64),
+            "alias": enc(aliases),
+            "noise": enc(NOISE_CONCEPTS),
+        }
+        print(f"[{backend}] 加载 {t_load:.1f}s  编码 {len(sents)} 句 {t_enc:.2f}s  → {len(sents) / t_enc:.0f} 句/秒")
+
+    base = results.get("torch")
+    if base is None:
+        print("torch 基准不可用，无法比较精度")
+        return
+    b_sem = base["sent"] @ base["anchor"]
+    b_sims = base["alias"] @ base["canon"].T
+    b_top, b_best = b_sims.argmax(axis=1), b_sims.max(axis=1)
+    b_noise = (base["alias"] @ base["noise"].T).max(axis=1)
+    for backend, r in results.items():
+        if backend == "torch":
+            continue
+        cos = np.sum(r["sent"] * base["sent"], axis=1)
+        sem = r["sent"] @ r["anchor"]
+        sims = r["alias"] @ r["canon"].T
+        top, best = sims.argmax(axis=1), sims.max(axis=1)
+        noise = (r["alias"] @ r["noise"].T).max(axis=1)
+        print(f"\n== {backend} vs torch fp32 ==")
+        print(f"句向量余弦：平均 {cos.mean():.5f}  最小 {cos.min():.5f}")
+        print(f"语义过滤 > 0.45      一致率 {_agree(sem > 0.45, b_sem > 0.45)}  |Δ| 最大 {np.abs(sem - b_sem).max():.4f}")
+        hit, b_hit = best >= 0.82, b_best >= 0.82
+        print(f"canonical ≥ 0.82     一致率 {_agree(hit, b_hit)}  |Δ| 最大 {np.abs(best - b_best).max():.4f}")
+        both = hit & b_hit
+        if both.any():
+            print(f"  两边都命中时 top-1 一致率 {_agree(top[both], b_top[both])}")
+        for t in (0.4, 0.6, 0.8):
+            print(f"垃圾词 > {t}          一致率 {_agree(noise > t, b_noise > t)}")
+        print(f"垃圾词相似度 |Δ| 最大 {np.abs(noise - b_noise).max():.4f}")
+
+if __name__ == "__main__":
+    main()
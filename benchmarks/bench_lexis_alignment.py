@@ -0,0 +1,108 @@
+# coding: utf-8
+"""
+Lexis 标题→正文对齐基准：合成 1,000 篇文章的 docx，
+对比旧的逐标题全表扫描与现在的「规范化文本 → 段落位置」索引。
+
+    python benchmarks/bench_lexis_alignment.py [n_articles]
+"""
+import sys
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx import Document
+
+from Corplink import state
+from Corplink.step_extract import extract_index_titles, parse_lexis_articles
+from Corplink.text_utils import _normalize
+
+def build_docx(path: Path, n_articles: int) -> None:
+    doc = Document()
+    doc.add_paragraph(f"Documents ({n_articles})")
+    for i in range(1, n_articles + 1):
+        doc.add_paragraph(f"{i}. Acme Holdings and Partner {i} sign supply agreement")
+        doc.add_paragraph("Client/Matter: -None-")
+        doc.add_paragraph("Search Terms: partner")
+    for i in range(1, n_articles + 1):
+        doc.add_paragraph(f"Acme Holdings and Partner {i} sign supply agreement")
+        doc.add_paragraph("Business Wire")
+        doc.add_paragraph("January 5, 2024 Friday")
+        doc.add_paragraph("Body")
+        for k in range(8):
+            doc.add_paragraph(
+                f"Acme Holdings said on Friday it will cooperate with Partner {i} "
+                f"on logistics project number {k}. The deal was announced in Tokyo."
+            )
+        doc.add_paragraph("Classification")
+        doc.add_paragraph("Language: ENGLISH")
+    doc.save(path)
+
+def legacy_alignment(paras, index_titles) -> int:
+    # 旧实现中占主导的两次全表扫描（每个标题各一次）
+    paras_norm = [_normalize(p) for p in paras]
+    found = 0
+    last = 0
+    for i_title, (_, _, title_norm) in enumerate(index_titles):
+        candidates = [i for i, n in enumerate(paras_norm) if i >= last and n == title_norm]
+        if not candidates:
+            continue
+        found += 1
+        last = candidates[0]
+        if i_title + 1 < len(index_titles):
+            nxt = index_titles[i_title + 1][2]
+            _ = [i for i, n in enumerate(paras_norm) if i > last + 20 and n == nxt]
+    return found
+
+def indexed_alignment(paras, index_titles) -> int:
+    norm_pos = {}
+    for i, p in enumerate(paras):
+        norm_pos.setdefault(_normalize(p), []).append(i)
+    found = 0
+    last = 0
+    for i_title, (_, _, title_norm) in enumerate(index_titles):
+        pos = norm_pos.get(title_norm, [])
+        k = bisect_left(pos, last)
+        if k >= len(pos):
+            continue
+        found += 1
+        last = pos[k]
+        if i_title + 1 < len(index_titles):
+            nxt = norm_pos.get(index_titles[i_title + 1][2], [])
+            _ = bisect_right(nxt, last + 20)
+    return found
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    state.KEYWORD_ROOTS = ["cooperat"]
+    state.USE_EXTRACT_CACHE = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"synthetic_{n}.docx"
+        t0 = time.perf_counter()
+        build_docx(path, n)
+        print(f"built {path.name} in {time.perf_counter() - t0:.1f}s")
+
+        paras = [p.text for p in Document(path).paragraphs]
+        titles = extract_index_titles(paras)
+        print(f"{len(paras)} paragraphs, {len(titles)} index titles")
+
+        t0 = time.perf_counter()
+        a = legacy_alignment(paras, titles)
+        t_legacy = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        b = indexed_alignment(paras, titles)
+        t_index = time.perf_counter() - t0
+        assert a == b, (a, b)
+        print(f"alignment  legacy scan: {t_legacy:.3f}s   position index: {t_index:.3f}s   "
+              f"(x{t_legacy / max(t_index, 1e-9):.0f})")
+
+        t0 = time.perf_counter()
+        parsed = parse_lexis_articles(str(path))
+        print(f"parse_lexis_articles: {time.perf_counter() - t0:.2f}s, "
+              f"{len(parsed['articles'])} articles aligned")
+
+if __name__ == "__main__":
+    main()
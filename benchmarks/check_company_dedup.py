@@ -0,0 +1,94 @@
+# coding: utf-8
+"""
+同行公司名包含去重：核对 ContainmentDeduper 与原逐行实现（两两 `in` 比较）结果一致，并比较耗时。
+随机数据覆盖：大小写/标点变体、互相包含的名称、只含非 ASCII 的名称（键为空串）、空白名称、重复行。
+
+    python benchmarks/check_company_dedup.py [n_rows] [seed]
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Corplink.company_dedup import ContainmentDeduper, write_row_names
+
+N_COLS = 50
+
+def reference_dedup(names):
+    """原 Step-2 / Step-3 中的实现。"""
+    def _norm_key(s: str) -> str:
+        return re.sub(r"[^A-Za-z0-9]", "", str(s)).lower()
+
+    cleaned, seen = [], set()
+    for nm in sorted(names, key=len, reverse=True):
+        k = _norm_key(nm)
+        if any(k in kk or kk in k for kk in seen):
+            continue
+        cleaned.append(nm)
+        seen.add(k)
+    return cleaned
+
+def reference_frame(df: pd.DataFrame, comp_cols) -> pd.DataFrame:
+    """原 Step-3 的逐行写回（df.at）。"""
+    df = df.copy()
+    for ridx in df.index:
+        vals = [v.strip() for v in df.loc[ridx, comp_cols].astype(str).tolist() if v.strip()]
+        cleaned = reference_dedup(vals)
+        for i, col in enumerate(comp_cols):
+            df.at[ridx, col] = cleaned[i] if i < len(cleaned) else ""
+    return df
+
+_BASE = ["Acme", "Acme Holdings", "ACME Holdings Inc.", "Acme-Holdings", "Beta Bio", "BetaBio Ltd",
+         "Gamma", "Gam", "Omega Labs", "Mega", "トヨタ", "ソニー", "AI", "A.I.", "Delta Air",
+         "Delta", "Air", "Sigma Tau", "Tau Sigma", "X", "IBM", "I.B.M.", "Novartis AG", "Nova"]
+
+def _name(rng: random.Random) -> str:
+    if rng.random() < 0.7:
+        return rng.choice(_BASE)
+    return "".join(rng.choice("abcdefgh -.") for _ in range(rng.randint(1, 12))).strip() or "z"
+
+def synth_rows(n_rows: int, rng: random.Random):
+    rows = []
+    for _ in range(n_rows):
+        if rows and rng.random() < 0.2:
+            rows.append(list(rng.choice(rows)))
+            continue
+        rows.append([_name(rng) for _ in range(rng.randint(0, 8))])
+    return rows
+
+def main() -> None:
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    rng = random.Random(seed)
+    rows = synth_rows(n_rows, rng)
+
+    deduper = ContainmentDeduper()
+    for r in rows:
+        want, got = reference_dedup(r), deduper.dedup(r)
+        assert want == got, (r, want, got)
+
+    comp_cols = [f"company_{i+1}" for i in range(N_COLS)]
+    df = pd.DataFrame([r + [""] * (N_COLS - len(r)) for r in rows], columns=comp_cols)
+    df.insert(0, "Sentence", [f"s{i}" for i in range(len(df))])
+
+    t0 = time.perf_counter()
+    want = reference_frame(df, comp_cols)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = df.copy()
+    values = [[v.strip() for v in r if v.strip()] for r in got[comp_cols].astype(str).to_numpy().tolist()]
+    write_row_names(got, comp_cols, ContainmentDeduper().dedup_rows(values))
+    t_new = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(want, got)
+    print(f"rows={n_rows}  结果一致")
+    print(f"逐行实现: {t_old:.2f}s   ContainmentDeduper（整列）: {t_new:.2f}s")
+
+if __name__ == "__main__":
+    main()
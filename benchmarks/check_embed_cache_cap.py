@@ -0,0 +1,62 @@
+# coding: utf-8
+"""
+向量缓存上限核对：用假的编码器（不需要模型），确认
+  - 单次 encode 的新文本远多于上限时，vectors.f16 与条目数都不超过 EMBED_CACHE_MAX_MB 对应的槽位数，
+    返回的向量与编码器的结果（float16 精度）一致；
+  - 多次调用、调小上限后重新打开时同样不超过上限，命中的向量仍然正确。
+不满足时以非零状态退出。
+
+    python benchmarks/check_embed_cache_cap.py
+"""
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Corplink.embed_cache import EmbeddingCache
+
+DIM = 64
+
+def fake_encoder(texts):
+    # 每个文本一个确定的伪随机向量
+    return np.stack([np.random.default_rng(int(hashlib.md5(t.encode()).hexdigest()[:8], 16))
+                     .standard_normal(DIM) for t in texts]).astype(np.float32)
+
+def expected(texts):
+    return fake_encoder(texts).astype(np.float16).astype(np.float32)
+
+def check(cache: EmbeddingCache, texts, label: str) -> bool:
+    got = cache.encode(texts, fake_encoder)
+    size = (cache.dir / "vectors.f16").stat().st_size
+    cap = cache.max_items * DIM * 2
+    n_rows = cache._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    ok = np.array_equal(got, expected(texts)) and size <= cap and len(cache._index) <= cache.max_items \
+        and n_rows == len(cache._index)
+    print(f"{label:<24} 文本 {len(texts):>6}  文件 {size:>8} / 上限 {cap:>8} 字节  "
+          f"条目 {len(cache._index):>5} / {cache.max_items}  向量{'一致' if ok else '异常'}")
+    return ok
+
+def main() -> None:
+    ok = True
+    with tempfile.TemporaryDirectory() as root:
+        cap_bytes = 2048 * DIM * 2  # 2048 个槽位
+        cache = EmbeddingCache("fake", DIM, cap_bytes, root=Path(root))
+        ok &= check(cache, [f"s{i}" for i in range(10000)], "单次超大调用")
+        ok &= check(cache, [f"s{i}" for i in range(10000)], "同一批再调用一次")
+        for r in range(5):
+            ok &= check(cache, [f"r{r}-{i}" for i in range(1500)] + [f"s{i}" for i in range(100)], f"第 {r + 1} 轮增量")
+        cache.close()
+
+        cache = EmbeddingCache("fake", DIM, 1024 * DIM * 2, root=Path(root))
+        ok &= check(cache, [f"r4-{i}" for i in range(1500)], "调小上限后重新打开")
+        ok &= check(cache, [f"t{i}" for i in range(3000)], "调小上限后新文本")
+        cache.close()
+    print("通过" if ok else "失败")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
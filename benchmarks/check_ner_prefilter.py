@@ -0,0 +1,71 @@
+# coding: utf-8
+"""
+NER 预筛（近似，默认关闭）的代价评估：用真实的 en_core_web_sm 逐句识别，统计被预筛跳过的句子
+（_max_companies < 2）里，不预筛时会给出名称的有多少——
+  - 丢名称：result.csv 里这一行的 company_* 会变少；
+  - 丢关系：不预筛时有 ≥ 2 个名称，即 Step-4 网络里会少一条同现关系。
+同时报告跳过比例，用来判断在某个语料上开启 ner_prefilter 是否划算。
+给定 result.csv（或任何含 Sentence 列的 csv）时用其中的句子，否则用内置样例。
+
+    python benchmarks/check_ner_prefilter.py [sentences.csv] [n_sentences]
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Corplink.lexicon import CompanyLexicon
+from Corplink.step_company import _ERS, _clean_ner_text, _companies_from_doc, _companies_from_names, _max_companies
+
+SAMPLES = [
+    "Pfizer said today it would expand the program.",
+    "Shares rose two percent in the first quarter this year.",
+    "Moderna and BioNTech signed a new supply agreement with the European Commission.",
+    "The company said on Monday that revenue rose sharply.",
+    "Analysts expect further growth next year.",
+    "Google announced a partnership with Mayo Clinic on Tuesday.",
+    "IBMers and Microsofters met in Boston.",
+    "It was the first such deal.",
+    "Revenue grew 12% to $3.4 billion, the company said.",
+    "acme inc and globex corp announced a merger.",
+]
+
+def main() -> None:
+    import spacy
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else None
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    if csv_path:
+        sents = list(dict.fromkeys(pd.read_csv(csv_path, dtype=str, keep_default_na=False)["Sentence"]))[:n]
+    else:
+        sents = SAMPLES
+    nlp = spacy.load("en_core_web_sm", disable=["parser", "lemmatizer"])
+    lexicon = CompanyLexicon()
+
+    texts = [_clean_ner_text(s) for s in sents]
+    skipped, lost_names, lost_pairs = 0, 0, []
+    t0 = time.perf_counter()
+    for txt, doc in zip(texts, nlp.pipe(texts, batch_size=256)):
+        if _max_companies(txt, lexicon) >= 2:
+            continue
+        skipped += 1
+        full = set(_companies_from_doc(doc, lexicon))
+        kept = set(_companies_from_names(list(dict.fromkeys(_ERS.findall(txt))), txt, lexicon))
+        if full - kept:
+            lost_names += 1
+            if len(full) >= 2:
+                lost_pairs.append((txt, sorted(full)))
+    elapsed = time.perf_counter() - t0
+
+    n = max(1, len(texts))
+    print(f"句子 {len(texts)}  预筛跳过 {skipped}（{skipped / n:.1%}）  "
+          f"其中丢名称 {lost_names}（{lost_names / n:.1%}）  丢关系 {len(lost_pairs)}（{len(lost_pairs) / n:.1%}）  "
+          f"耗时 {elapsed:.1f}s")
+    for txt, names in lost_pairs[:20]:
+        print(f"  {names}  ← {txt}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# coding: utf-8
+"""
+并行读取 zip 成员的核对：主进程先 list_archive_files（会打开并缓存 zip 句柄），
+再由 fork 出的多个子进程并发读取各成员，比较读到的内容与原始数据的 SHA-1 是否一致。
+子进程如果沿用主进程的句柄（共享文件偏移），会出现 Bad CRC / zlib 错误或内容错位。
+
+    python benchmarks/check_zip_workers.py [n_members] [workers]
+"""
+import hashlib
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Corplink.input_source import list_archive_files
+
+def _member_bytes(i: int) -> bytes:
+    # 每个成员内容不同、可压缩但不至于太小，让多个子进程的读取在时间上重叠
+    return (f"{{\\rtf1 member {i} ".encode() + os.urandom(2048).hex().encode() * 40 + b"}")
+
+def _read(task) -> tuple:
+    try:
+        src = task.source()
+        data = src.read() if hasattr(src, "read") else Path(src).read_bytes()
+        return task.location, hashlib.sha1(data).hexdigest(), ""
+    except Exception as e:
+        return task.location, "", f"{type(e).__name__}: {e}"
+
+def main() -> None:
+    n_members = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "input.zip")
+        expected = {}
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for i in range(n_members):
+                name = f"T1/T2/doc_{i:04d}.rtf"
+                data = _member_bytes(i)
+                zf.writestr(name, data)
+                expected[name] = hashlib.sha1(data).hexdigest()
+
+        files = list_archive_files(path, ".rtf")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("fork")) as pool:
+            results = list(pool.map(_read, files))
+
+    bad = [(loc, err or "内容不一致") for loc, digest, err in results if digest != expected[loc]]
+    print(f"成员 {n_members}  子进程 {workers}  失败 {len(bad)}")
+    for loc, err in bad[:10]:
+        print(f"  {loc}: {err}")
+    sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
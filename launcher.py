@@ -15,9 +15,22 @@ FILES = [
     "Corplink/__init__.py",
     "Corplink/options.py", 
     "Corplink/factiva_rtf.py",
+    "Corplink/rtf_tables.py",
+    "Corplink/keyword_matcher.py",
+    "Corplink/lexis_docx.py",
+    "Corplink/embed_cache.py",
+    "Corplink/article_dedup.py",
+    "Corplink/lexicon.py",
+    "Corplink/nn_index.py",
+    "Corplink/fuzzy_match.py",
+    "Corplink/company_dedup.py",
+    "Corplink/ner_cache.py",
+    "Corplink/file_lock.py",
     "Corplink/config.py",
     "Corplink/constants.py",
     "Corplink/env_bootstrap.py",
+    "Corplink/input_source.py",
+    "Corplink/extract_cache.py",
     "Corplink/main.py",
     "Corplink/model_utils.py",
     "Corplink/state.py",